@@ -1,48 +1,121 @@
 #!/usr/bin/env python3
 import argparse
+import re
+import shutil
+import subprocess
 from pathlib import Path
 
-from pydub import AudioSegment
+# One DFA pass replaces the split/isdigit/int dance: optional minutes
+# followed by ':' or '.', then seconds.
+_TS_RE = re.compile(r"^\s*(?:(\d+)[:.])?(\d+)\s*$")
 
 
 def parse_timestamp(timestamp: str) -> int:
     """Parse a timestamp like '1.21' or '01:21' into milliseconds."""
-    value = timestamp.strip()
-    if ":" in value:
-        parts = value.split(":")
-        if len(parts) != 2:
-            raise ValueError("Timestamp must be MM:SS or M.SS")
-        minutes_str, seconds_str = parts
-    else:
-        parts = value.split(".")
-        if len(parts) == 1:
-            minutes_str, seconds_str = "0", parts[0]
-        elif len(parts) == 2:
-            minutes_str, seconds_str = parts
-        else:
-            raise ValueError("Timestamp must be MM:SS or M.SS")
-
-    if not minutes_str.isdigit() or not seconds_str.isdigit():
-        raise ValueError("Minutes and seconds must be numeric")
-
-    minutes = int(minutes_str)
-    seconds = int(seconds_str)
+    # Fast path for the bare-seconds form: one C-level isdigit/int pair
+    # instead of a regex match.
+    if timestamp.isdigit():
+        seconds = int(timestamp)
+        if seconds >= 60:
+            raise ValueError("Seconds must be between 0 and 59")
+        return seconds * 1000
+
+    match = _TS_RE.match(timestamp)
+    if not match:
+        raise ValueError("Timestamp must be MM:SS or M.SS")
+
+    minutes = int(match.group(1) or 0)
+    seconds = int(match.group(2))
     if seconds >= 60:
         raise ValueError("Seconds must be between 0 and 59")
 
     return (minutes * 60 + seconds) * 1000
 
 
-def cut_audio(input_path: Path, output_path: Path, timestamp_ms: int) -> None:
+def _probe_duration_ms(input_path: Path) -> int | None:
+    """Return the input duration in milliseconds via ffprobe, or None if unknown."""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None
+    result = subprocess.run(
+        [
+            ffprobe,
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(input_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        return int(float(result.stdout.strip()) * 1000)
+    except ValueError:
+        return None
+
+
+def _cut_audio_pydub(input_path: Path, output_path: Path, timestamp_ms: int) -> None:
+    """Fallback: decode the whole file with pydub and slice in memory."""
+    from pydub import AudioSegment
+
     audio = AudioSegment.from_file(input_path)
     if timestamp_ms < 0 or timestamp_ms > len(audio):
         raise ValueError("Timestamp is outside audio duration")
 
     clipped = audio[:timestamp_ms]
-    output_path.parent.mkdir(parents=True, exist_ok=True)
     clipped.export(output_path, format=output_path.suffix.lstrip("."))
 
 
+def cut_audio(
+    input_path: Path,
+    output_path: Path,
+    timestamp_ms: int,
+    reencode: bool = False,
+) -> None:
+    """Cut the head of an audio file up to timestamp_ms.
+
+    Prefers ffmpeg stream-copy, which copies compressed packets without
+    decoding the file into RAM; falls back to pydub when ffmpeg is missing.
+    With reencode=True the audio is decoded and re-encoded, for container/
+    codec combinations where stream-copy produces broken output.
+    """
+    if timestamp_ms < 0:
+        raise ValueError("Timestamp must be positive")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if shutil.which("ffmpeg") is None:
+        _cut_audio_pydub(input_path, output_path, timestamp_ms)
+        return
+
+    # Match the pydub fallback's contract: a timestamp past the end of the
+    # file is an error, not a no-op copy of the whole input.
+    duration_ms = _probe_duration_ms(input_path)
+    if duration_ms is not None and timestamp_ms > duration_ms:
+        raise ValueError("Timestamp is outside audio duration")
+
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-to",
+        f"{timestamp_ms / 1000:.3f}",
+        "-i",
+        str(input_path),
+    ]
+    if not reencode:
+        cmd += ["-c", "copy"]
+    cmd.append(str(output_path))
+    subprocess.run(cmd, check=True)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Cut an audio file at a timestamp.")
     parser.add_argument("input", type=Path, help="Input audio file path")
@@ -54,6 +127,11 @@ def main() -> None:
         default=None,
         help="Output audio file path (defaults to input name + _cut)",
     )
+    parser.add_argument(
+        "--reencode",
+        action="store_true",
+        help="Re-encode instead of stream-copying (for incompatible containers)",
+    )
     args = parser.parse_args()
 
     timestamp_ms = parse_timestamp(args.timestamp)
@@ -64,7 +142,7 @@ def main() -> None:
     else:
         output_path = args.output
 
-    cut_audio(args.input, output_path, timestamp_ms)
+    cut_audio(args.input, output_path, timestamp_ms, reencode=args.reencode)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""Shared on-disk result cache for the separation wrappers.
+
+Separating the same input with the same tool+model is fully deterministic,
+so repeated R&D runs can reuse previous outputs instead of re-running the
+neural separator. Results are stored content-addressed under
+~/.cache/tech_europe_ai/separation/<tool>/<model>/<input-digest>/ and
+published into the caller's output directory via hardlinks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Callable
+
+CACHE_ROOT = Path.home() / ".cache" / "tech_europe_ai" / "separation"
+
+_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(path: Path) -> str:
+    """Digest file contents in streaming chunks (no full-file allocation)."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except (OSError, NotImplementedError):
+        shutil.copy2(src, dst)
+
+
+def cached_separate(
+    input_audio: Path,
+    model: str,
+    tool: str,
+    track_out: Path,
+    produce: Callable[[], tuple[Path, Path]],
+) -> tuple[Path, Path]:
+    """Return (vocals, music) for input_audio, reusing cached stems when possible.
+
+    On a miss, produce() runs the actual separation and must return the
+    published (vocals, music) paths; both are then linked into the cache so
+    the next identical invocation skips the separator entirely.
+    """
+    entry = CACHE_ROOT / tool / model / hash_file(input_audio)
+    cached_vocals = entry / "vocals.wav"
+    cached_music = entry / "music.wav"
+
+    vocals_out = track_out / "vocals.wav"
+    music_out = track_out / "music.wav"
+
+    if cached_vocals.exists() and cached_music.exists():
+        track_out.mkdir(parents=True, exist_ok=True)
+        _link_or_copy(cached_vocals, vocals_out)
+        _link_or_copy(cached_music, music_out)
+        return vocals_out, music_out
+
+    vocals_out, music_out = produce()
+
+    entry.mkdir(parents=True, exist_ok=True)
+    _link_or_copy(vocals_out, cached_vocals)
+    _link_or_copy(music_out, cached_music)
+    return vocals_out, music_out
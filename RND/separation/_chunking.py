@@ -0,0 +1,111 @@
+"""ffmpeg-based file chunking shared by the separation wrappers.
+
+Hour-long inputs make the underlying tools load the whole song into
+RAM/VRAM and OOM on small machines. Splitting the file into fixed-duration
+stream-copied chunks, separating each chunk, and concatenating the stems
+keeps peak memory proportional to the chunk duration instead of the song
+length.
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Callable
+
+import _common
+
+
+def chunk_audio(input_audio: Path, seconds: int, workdir: Path) -> list[Path]:
+    """Split input_audio into fixed-duration chunks without re-encoding."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    pattern = workdir / f"chunk_%03d{input_audio.suffix}"
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        str(input_audio),
+        "-f",
+        "segment",
+        "-segment_time",
+        str(seconds),
+        "-c",
+        "copy",
+        str(pattern),
+    ]
+    result = subprocess.run(cmd, text=True, capture_output=True)
+    if result.returncode != 0:
+        detail = (result.stderr or result.stdout or "").strip()
+        raise RuntimeError(f"ffmpeg chunking failed: {detail}")
+
+    chunks = sorted(workdir.glob(f"chunk_*{input_audio.suffix}"))
+    if not chunks:
+        raise RuntimeError(f"ffmpeg produced no chunks in: {workdir}")
+    return chunks
+
+
+def concat_audio(parts: list[Path], output: Path) -> None:
+    """Concatenate parts into output via ffmpeg's concat demuxer (stream copy)."""
+    list_file = output.parent / f"{output.stem}_concat.txt"
+    list_file.write_text("".join(f"file '{part}'\n" for part in parts), encoding="utf-8")
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_file),
+        "-c",
+        "copy",
+        str(output),
+    ]
+    try:
+        result = subprocess.run(cmd, text=True, capture_output=True)
+        if result.returncode != 0:
+            detail = (result.stderr or result.stdout or "").strip()
+            raise RuntimeError(f"ffmpeg concat failed: {detail}")
+    finally:
+        list_file.unlink(missing_ok=True)
+
+
+def chunked_separate(
+    input_audio: Path,
+    output_dir: Path,
+    seconds: int,
+    separate_one: Callable[[Path, Path], tuple[Path, Path]],
+) -> tuple[Path, Path]:
+    """Separate input_audio chunk by chunk and concatenate the stems.
+
+    separate_one(chunk, out_dir) must run a single-file separation and
+    return the (vocals, music) paths, i.e. the wrappers' own separate().
+    """
+    input_audio = _common.require_file(input_audio)
+
+    work = output_dir / "_chunks"
+    chunks = chunk_audio(input_audio, seconds, work)
+
+    vocals_parts: list[Path] = []
+    music_parts: list[Path] = []
+    for index, chunk in enumerate(chunks):
+        vocals_part, music_part = separate_one(chunk, work / f"part_{index:03d}")
+        vocals_parts.append(vocals_part)
+        music_parts.append(music_part)
+
+    track_out = output_dir / input_audio.stem
+    track_out.mkdir(parents=True, exist_ok=True)
+    vocals_out = track_out / "vocals.wav"
+    music_out = track_out / "music.wav"
+    concat_audio(vocals_parts, vocals_out)
+    concat_audio(music_parts, music_out)
+
+    shutil.rmtree(work, ignore_errors=True)
+    return vocals_out, music_out
@@ -0,0 +1,103 @@
+"""Process and filesystem helpers shared by the separation wrappers.
+
+Each wrapper shells out to its separator, validates its input, and
+publishes stems under normalized names; these helpers hold that common
+machinery in one place instead of one diverging copy per wrapper.
+"""
+
+from __future__ import annotations
+
+import collections
+import os
+import shutil
+import stat
+import subprocess
+from pathlib import Path
+
+
+def torch_jit_cache_env() -> dict[str, str]:
+    """Child-process environment with persistent torch JIT/model caches.
+
+    Torch Inductor rebuilds its compiled kernels on every process start
+    unless pointed at a cache dir; persisting the artifacts turns a long
+    warmup into sub-second on subsequent runs.
+    """
+    env = os.environ.copy()
+    cache_root = Path.home() / ".cache"
+    env.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_root / "torchinductor"))
+    env.setdefault("HF_HOME", str(cache_root / "hf"))
+    return env
+
+
+def run_capture_tail(
+    cmd: list[str], max_lines: int = 512, env: dict[str, str] | None = None
+) -> tuple[int, str]:
+    """Run cmd, streaming its output and keeping only the last lines.
+
+    Long separations can emit tens of MB of progress logs; buffering them
+    whole (capture_output=True) holds everything in RAM although the output
+    is only ever inspected on failure. A bounded deque keeps RSS flat while
+    still producing an actionable error message.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=env,
+    )
+    tail: collections.deque[str] = collections.deque(maxlen=max_lines)
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        tail.append(line)
+    returncode = proc.wait()
+    return returncode, "".join(tail)
+
+
+def copy_kernel(src: Path, dst: Path) -> None:
+    """Copy src to dst without bouncing bytes through user space.
+
+    os.copy_file_range keeps the copy in the kernel (and reflinks on
+    XFS/Btrfs, making it instant); shutil.copyfile is the portable
+    fallback. Metadata is deliberately not copied — stems have no
+    meaningful mtime.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                remaining = os.fstat(s.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            return
+        except OSError:
+            dst.unlink(missing_ok=True)
+    shutil.copyfile(src, dst)
+
+
+def publish(src: Path, dst: Path) -> None:
+    """Publish a stem via hardlink, falling back to a copy across filesystems."""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except (OSError, NotImplementedError):
+        copy_kernel(src, dst)
+
+
+def require_file(input_audio: Path) -> Path:
+    """Validate the input with a single stat call and return it as absolute.
+
+    resolve() + exists() + is_file() issues a stat per path component plus
+    two more; on network mounts each one is an RPC. One stat and a pure
+    string abspath keep cold-start latency down.
+    """
+    try:
+        st = input_audio.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input audio not found: {input_audio}") from None
+    if not stat.S_ISREG(st.st_mode):
+        raise FileNotFoundError(f"Input audio not found: {input_audio}")
+    return Path(os.path.abspath(input_audio))
@@ -1,11 +1,60 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import os
 import shutil
 import subprocess
 import sys
 from pathlib import Path
 
+# The wrappers are standalone uv projects; make the shared modules
+# in RND/separation importable regardless of which one is running.
+_SEPARATION_ROOT = str(Path(__file__).resolve().parents[1])
+if _SEPARATION_ROOT not in sys.path:
+    sys.path.insert(0, _SEPARATION_ROOT)
+
+import _cache
+import _chunking
+import _common
+import engine
+
+
+def _auto_segment(device: str) -> int | None:
+    """Pick a Demucs --segment length from free VRAM; None keeps the default.
+
+    Shorter segments bound peak VRAM, so small cards stop OOMing. The
+    segment is only ever shrunk, never raised: transformer models (the
+    default htdemucs) cap --segment at their trained length (7.8 s) and
+    demucs.separate errors out above it.
+    """
+    if device != "cuda":
+        return None
+    nvidia_smi = shutil.which("nvidia-smi")
+    if not nvidia_smi:
+        return None
+    try:
+        result = subprocess.run(
+            [nvidia_smi, "--query-gpu=memory.free", "--format=csv,noheader,nounits"],
+            text=True,
+            capture_output=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        free_mb = max(int(line) for line in result.stdout.split() if line)
+    except ValueError:
+        return None
+    if free_mb >= 6000:
+        # Enough headroom for the model's default segment.
+        return None
+    if free_mb >= 4000:
+        return 6
+    return 4
+
 
 def _find_demucs_stem_dir(base_output: Path, model: str, input_file: Path) -> Path:
     # Demucs writes stems under: <out>/<model>/<track_name>/...
@@ -25,10 +74,17 @@ def _find_demucs_stem_dir(base_output: Path, model: str, input_file: Path) -> Pa
     return candidates[0]
 
 
-def separate(input_audio: Path, output_dir: Path, model: str, device: str) -> tuple[Path, Path]:
-    input_audio = input_audio.resolve()
-    if not input_audio.exists() or not input_audio.is_file():
-        raise FileNotFoundError(f"Input audio not found: {input_audio}")
+def _prepare_run(
+    input_audio: Path,
+    output_dir: Path,
+    model: str,
+    device: str,
+    shifts: int = 0,
+    overlap: float = 0.1,
+    segment: int | None = None,
+) -> tuple[Path, Path, list[str]]:
+    """Validate the input, create output dirs, and build the Demucs command."""
+    input_audio = _common.require_file(input_audio)
 
     output_dir.mkdir(parents=True, exist_ok=True)
     # Keep raw tool output separate from normalized final outputs.
@@ -50,18 +106,29 @@ def separate(input_audio: Path, output_dir: Path, model: str, device: str) -> tu
         device,
         "-n",
         model,
+        # No random shifts and a small overlap by default: ~2x faster than
+        # upstream defaults for a barely measurable quality difference.
+        "--shifts",
+        str(shifts),
+        "--overlap",
+        str(overlap),
+    ]
+    if segment is None:
+        segment = _auto_segment(device)
+    if segment is not None:
+        cmd += ["--segment", str(segment)]
+    if device == "cpu":
+        cmd += ["--jobs", str(os.cpu_count() or 1)]
+    cmd += [
         "-o",
         str(demucs_tmp),
         str(input_audio),
     ]
+    return input_audio, demucs_tmp, cmd
 
-    print(f"[demucs] Running: {' '.join(cmd)}")
-    # capture_output=True lets us return concise, actionable error messages to users.
-    result = subprocess.run(cmd, text=True, capture_output=True)
-    if result.returncode != 0:
-        detail = (result.stderr or result.stdout or "").strip()
-        raise RuntimeError(f"Demucs separation failed: {detail}")
 
+def _publish_outputs(demucs_tmp: Path, model: str, input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
+    """Locate raw Demucs stems and publish them under normalized names."""
     stem_dir = _find_demucs_stem_dir(demucs_tmp, model, input_audio)
 
     vocals_src = stem_dir / "vocals.wav"
@@ -76,25 +143,202 @@ def separate(input_audio: Path, output_dir: Path, model: str, device: str) -> tu
     # Demucs emits `no_vocals.wav`; we expose `music.wav`.
     vocals_out = track_out / "vocals.wav"
     music_out = track_out / "music.wav"
-    shutil.copy2(vocals_src, vocals_out)
-    shutil.copy2(music_src, music_out)
+    _common.publish(vocals_src, vocals_out)
+    _common.publish(music_src, music_out)
 
     return vocals_out, music_out
 
 
+def separate(
+    input_audio: Path,
+    output_dir: Path,
+    model: str,
+    device: str,
+    use_cache: bool = False,
+    shifts: int = 0,
+    overlap: float = 0.1,
+    segment: int | None = None,
+    chunk_duration: int | None = None,
+) -> tuple[Path, Path]:
+    if chunk_duration:
+        return _chunking.chunked_separate(
+            input_audio,
+            output_dir,
+            chunk_duration,
+            lambda chunk, out: separate(
+                chunk, out, model, device,
+                shifts=shifts, overlap=overlap, segment=segment,
+            ),
+        )
+
+    def _produce() -> tuple[Path, Path]:
+        if engine.available():
+            prepared_input = _common.require_file(input_audio)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            demucs_tmp = output_dir / "_demucs_raw"
+            demucs_tmp.mkdir(parents=True, exist_ok=True)
+            print(f"[demucs] Separating in-process with cached {model} on {device}")
+            engine.separate_file(
+                prepared_input, demucs_tmp, model, device,
+                shifts=shifts, overlap=overlap, segment=segment,
+            )
+            return _publish_outputs(demucs_tmp, model, prepared_input, output_dir)
+
+        prepared_input, demucs_tmp, cmd = _prepare_run(
+            input_audio, output_dir, model, device, shifts, overlap, segment
+        )
+
+        print(f"[demucs] Running: {' '.join(cmd)}")
+        returncode, output = _common.run_capture_tail(cmd, env=_common.torch_jit_cache_env())
+        if returncode != 0:
+            raise RuntimeError(f"Demucs separation failed: {output.strip()}")
+
+        return _publish_outputs(demucs_tmp, model, prepared_input, output_dir)
+
+    if not use_cache:
+        return _produce()
+
+    input_audio = _common.require_file(input_audio)
+    track_out = output_dir / input_audio.stem
+    return _cache.cached_separate(input_audio, model, "demucs", track_out, _produce)
+
+
+async def separate_async(
+    input_audio: Path,
+    output_dir: Path,
+    model: str,
+    device: str,
+    shifts: int = 0,
+    overlap: float = 0.1,
+    segment: int | None = None,
+) -> tuple[Path, Path]:
+    """Async variant of separate(): the event loop stays free while Demucs runs."""
+    input_audio, demucs_tmp, cmd = _prepare_run(
+        input_audio, output_dir, model, device, shifts, overlap, segment
+    )
+
+    print(f"[demucs] Running: {' '.join(cmd)}")
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=_common.torch_jit_cache_env(),
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        detail = (stderr or stdout or b"").decode(errors="replace").strip()
+        raise RuntimeError(f"Demucs separation failed: {detail}")
+
+    return _publish_outputs(demucs_tmp, model, input_audio, output_dir)
+
+
+def separate_batch(
+    inputs: list[Path],
+    output_dir: Path,
+    model: str,
+    device: str,
+) -> list[tuple[Path, Path]]:
+    """Separate several files, batched into one forward pass when possible.
+
+    With demucs importable, all clips go through the model as one padded
+    batch (see engine.separate_batch); otherwise each file falls back to
+    a plain separate() call.
+    """
+    if engine.available():
+        inputs = [_common.require_file(path) for path in inputs]
+        output_dir.mkdir(parents=True, exist_ok=True)
+        print(f"[demucs] Batch-separating {len(inputs)} files in-process")
+        return engine.separate_batch(inputs, output_dir, model, device)
+    return [separate(path, output_dir, model, device) for path in inputs]
+
+
+async def separate_many(
+    inputs: list[Path],
+    output_dir: Path,
+    model: str,
+    device: str,
+    n_workers: int = 2,
+) -> list[tuple[Path, Path]]:
+    """Separate several files concurrently, capped at n_workers subprocesses."""
+    semaphore = asyncio.Semaphore(n_workers)
+
+    async def _one(path: Path) -> tuple[Path, Path]:
+        async with semaphore:
+            return await separate_async(path, output_dir, model, device)
+
+    return list(await asyncio.gather(*(_one(path) for path in inputs)))
+
+
+_AUDIO_SUFFIXES = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Split one audio file into vocals + music using Demucs.")
-    parser.add_argument("input_audio", type=Path, help="Path to input audio file (wav/mp3).")
+    parser.add_argument(
+        "input_audio", type=Path, help="Path to input audio file (or a directory with --batch)."
+    )
     parser.add_argument("--output-dir", "-o", type=Path, default=Path("./outputs"), help="Directory for outputs.")
     parser.add_argument("--model", "-m", default="htdemucs", help="Demucs model name.")
     parser.add_argument("--device", default="cpu", help="Device: cpu or cuda.")
+    parser.add_argument("--shifts", type=int, default=0, help="Random equivariant shifts (0 = fastest).")
+    parser.add_argument("--overlap", type=float, default=0.1, help="Overlap between prediction windows.")
+    parser.add_argument(
+        "--segment",
+        type=int,
+        default=None,
+        help="Segment length in seconds (default: auto from free VRAM on cuda).",
+    )
+    parser.add_argument(
+        "--chunk-duration",
+        type=int,
+        default=None,
+        help="Split the input into chunks of this many seconds to bound memory.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Treat input as a directory and separate every audio file in it.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Skip the on-disk result cache.")
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
+    if args.batch:
+        if not args.input_audio.is_dir():
+            print("[demucs] ERROR: --batch requires a directory as input")
+            return 1
+        files = sorted(
+            p for p in args.input_audio.iterdir()
+            if p.is_file() and p.suffix.lower() in _AUDIO_SUFFIXES
+        )
+        if not files:
+            print(f"[demucs] ERROR: no audio files found in {args.input_audio}")
+            return 1
+        try:
+            results = separate_batch(files, args.output_dir, args.model, args.device)
+        except Exception as exc:
+            print(f"[demucs] ERROR: {exc}")
+            return 1
+        print("[demucs] Separation complete")
+        for vocals_out, music_out in results:
+            print(f"[demucs] vocals: {vocals_out}")
+            print(f"[demucs] music:  {music_out}")
+        return 0
+
     try:
-        vocals_out, music_out = separate(args.input_audio, args.output_dir, args.model, args.device)
+        vocals_out, music_out = separate(
+            args.input_audio,
+            args.output_dir,
+            args.model,
+            args.device,
+            use_cache=not args.no_cache,
+            shifts=args.shifts,
+            overlap=args.overlap,
+            segment=args.segment,
+            chunk_duration=args.chunk_duration,
+        )
     except Exception as exc:
         text = str(exc).lower()
         print(f"[demucs] ERROR: {exc}")
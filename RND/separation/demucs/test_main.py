@@ -17,14 +17,14 @@ class DemucsTests(unittest.TestCase):
             input_audio.write_bytes(b"audio")
             out_dir = tmp_path / "out"
 
-            def fake_run(*args, **kwargs):
+            def fake_popen(*args, **kwargs):
                 stem_dir = out_dir / "_demucs_raw" / "htdemucs" / "song"
                 stem_dir.mkdir(parents=True, exist_ok=True)
                 (stem_dir / "vocals.wav").write_bytes(b"v")
                 (stem_dir / "no_vocals.wav").write_bytes(b"m")
-                return SimpleNamespace(returncode=0, stdout="", stderr="")
+                return SimpleNamespace(stdout=iter(()), wait=lambda: 0)
 
-            with patch("main.subprocess.run", side_effect=fake_run):
+            with patch("_common.subprocess.Popen", side_effect=fake_popen):
                 vocals, music = main.separate(input_audio, out_dir, "htdemucs", "cpu")
 
             self.assertTrue(vocals.exists())
@@ -1,20 +1,44 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import shutil
-import subprocess
 import sys
+import tempfile
 from pathlib import Path
 
+# The wrappers are standalone uv projects; make the shared modules
+# in RND/separation importable regardless of which one is running.
+_SEPARATION_ROOT = str(Path(__file__).resolve().parents[1])
+if _SEPARATION_ROOT not in sys.path:
+    sys.path.insert(0, _SEPARATION_ROOT)
 
-def separate(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
-    input_audio = input_audio.resolve()
-    if not input_audio.exists() or not input_audio.is_file():
-        raise FileNotFoundError(f"Input audio not found: {input_audio}")
+import _cache
+import _chunking
+import _common
+
+UMX_MODEL = "umxl"
+
+
+def _raw_stem_dir() -> tempfile.TemporaryDirectory[str]:
+    """Create a throwaway dir for raw umx stems, preferring tmpfs.
+
+    The four raw stems are only read once (vocals publish + music mix), so
+    keeping them on /dev/shm avoids ~120 MB of disk round-trip per track;
+    the TemporaryDirectory cleans them up as soon as separation finishes.
+    """
+    shm = Path("/dev/shm")
+    return tempfile.TemporaryDirectory(
+        prefix="openunmix_raw_",
+        dir=str(shm) if shm.is_dir() else None,
+    )
+
+
+def _prepare_run(input_audio: Path, output_dir: Path, umx_tmp: Path) -> tuple[Path, list[str]]:
+    """Validate the input, create output dirs, and build the umx command."""
+    input_audio = _common.require_file(input_audio)
 
     output_dir.mkdir(parents=True, exist_ok=True)
-    umx_tmp = output_dir / "_openunmix_raw"
-    umx_tmp.mkdir(parents=True, exist_ok=True)
 
     umx_bin = shutil.which("umx")
     if not umx_bin:
@@ -25,12 +49,11 @@ def separate(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
         raise RuntimeError("Open-Unmix CLI `umx` not found. Install openunmix in this Python environment.")
 
     cmd = [umx_bin, str(input_audio), "--outdir", str(umx_tmp)]
-    print(f"[openunmix] Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, text=True, capture_output=True)
-    if result.returncode != 0:
-        detail = (result.stderr or result.stdout or "").strip()
-        raise RuntimeError(f"Open-Unmix separation failed: {detail}")
+    return input_audio, cmd
+
 
+def _collect_stems(umx_tmp: Path, input_audio: Path) -> tuple[Path, Path, Path, Path]:
+    """Return the four raw stems, raising when any is missing."""
     stem_dir = umx_tmp / input_audio.stem
     vocals_src = stem_dir / "vocals.wav"
     drums_src = stem_dir / "drums.wav"
@@ -43,14 +66,39 @@ def separate(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
         missing_text = ", ".join(missing)
         raise FileNotFoundError(f"Expected Open-Unmix stems missing: {missing_text}")
 
-    track_out = output_dir / input_audio.stem
-    track_out.mkdir(parents=True, exist_ok=True)
-    vocals_out = track_out / "vocals.wav"
-    music_out = track_out / "music.wav"
+    return vocals_src, drums_src, bass_src, other_src
 
-    shutil.copy2(vocals_src, vocals_out)
 
-    ffmpeg_cmd = [
+def _mix_stems(drums_src: Path, bass_src: Path, other_src: Path, music_out: Path) -> bool:
+    """Sum the three accompaniment stems in-process; True on success.
+
+    The raw stems are already PCM WAV, so forking ffmpeg's amix decodes
+    and re-encodes uncompressed audio for nothing. One vectorized NumPy
+    sum (in place, no temporaries) is memory-bound and skips the
+    subprocess entirely. Returns False when soundfile/numpy are missing
+    or a stem cannot be read, so callers can fall back to ffmpeg.
+    """
+    try:
+        import numpy as np
+        import soundfile as sf
+    except ImportError:
+        return False
+
+    try:
+        mix, samplerate = sf.read(drums_src, dtype="float32")
+        bass, _ = sf.read(bass_src, dtype="float32")
+        other, _ = sf.read(other_src, dtype="float32")
+    except RuntimeError:
+        return False
+
+    np.add(mix, bass, out=mix)
+    np.add(mix, other, out=mix)
+    sf.write(music_out, mix, samplerate, subtype="PCM_16")
+    return True
+
+
+def _ffmpeg_mix_cmd(drums_src: Path, bass_src: Path, other_src: Path, music_out: Path) -> list[str]:
+    return [
         "ffmpeg",
         "-y",
         "-i",
@@ -63,25 +111,139 @@ def separate(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
         "amix=inputs=3:normalize=0",
         str(music_out),
     ]
-    mix_result = subprocess.run(ffmpeg_cmd, text=True, capture_output=True)
-    if mix_result.returncode != 0:
-        detail = (mix_result.stderr or mix_result.stdout or "").strip()
-        raise RuntimeError(f"ffmpeg mix failed: {detail}")
 
-    return vocals_out, music_out
+
+def separate(
+    input_audio: Path,
+    output_dir: Path,
+    use_cache: bool = False,
+    chunk_duration: int | None = None,
+) -> tuple[Path, Path]:
+    if chunk_duration:
+        return _chunking.chunked_separate(
+            input_audio,
+            output_dir,
+            chunk_duration,
+            lambda chunk, out: separate(chunk, out),
+        )
+
+    def _produce() -> tuple[Path, Path]:
+        with _raw_stem_dir() as raw_dir:
+            umx_tmp = Path(raw_dir)
+            prepared_input, cmd = _prepare_run(input_audio, output_dir, umx_tmp)
+
+            print(f"[openunmix] Running: {' '.join(cmd)}")
+            returncode, output = _common.run_capture_tail(cmd, env=_common.torch_jit_cache_env())
+            if returncode != 0:
+                raise RuntimeError(f"Open-Unmix separation failed: {output.strip()}")
+
+            vocals_src, drums_src, bass_src, other_src = _collect_stems(umx_tmp, prepared_input)
+
+            track_out = output_dir / prepared_input.stem
+            track_out.mkdir(parents=True, exist_ok=True)
+            vocals_out = track_out / "vocals.wav"
+            music_out = track_out / "music.wav"
+
+            # publish hardlinks when the raw dir shares a filesystem with the
+            # output and transparently copies when it lives on tmpfs.
+            _common.publish(vocals_src, vocals_out)
+
+            if not _mix_stems(drums_src, bass_src, other_src, music_out):
+                ffmpeg_cmd = _ffmpeg_mix_cmd(drums_src, bass_src, other_src, music_out)
+                mix_returncode, mix_output = _common.run_capture_tail(ffmpeg_cmd)
+                if mix_returncode != 0:
+                    raise RuntimeError(f"ffmpeg mix failed: {mix_output.strip()}")
+
+            return vocals_out, music_out
+
+    if not use_cache:
+        return _produce()
+
+    input_audio = _common.require_file(input_audio)
+    track_out = output_dir / input_audio.stem
+    return _cache.cached_separate(input_audio, UMX_MODEL, "openunmix", track_out, _produce)
+
+
+async def separate_async(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
+    """Async variant of separate(): the event loop stays free while umx/ffmpeg run."""
+    with _raw_stem_dir() as raw_dir:
+        umx_tmp = Path(raw_dir)
+        input_audio, cmd = _prepare_run(input_audio, output_dir, umx_tmp)
+
+        print(f"[openunmix] Running: {' '.join(cmd)}")
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=_common.torch_jit_cache_env(),
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            detail = (stderr or stdout or b"").decode(errors="replace").strip()
+            raise RuntimeError(f"Open-Unmix separation failed: {detail}")
+
+        vocals_src, drums_src, bass_src, other_src = _collect_stems(umx_tmp, input_audio)
+
+        track_out = output_dir / input_audio.stem
+        track_out.mkdir(parents=True, exist_ok=True)
+        vocals_out = track_out / "vocals.wav"
+        music_out = track_out / "music.wav"
+
+        _common.publish(vocals_src, vocals_out)
+
+        mixed = await asyncio.to_thread(_mix_stems, drums_src, bass_src, other_src, music_out)
+        if not mixed:
+            mix_proc = await asyncio.create_subprocess_exec(
+                *_ffmpeg_mix_cmd(drums_src, bass_src, other_src, music_out),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            mix_stdout, mix_stderr = await mix_proc.communicate()
+            if mix_proc.returncode != 0:
+                detail = (mix_stderr or mix_stdout or b"").decode(errors="replace").strip()
+                raise RuntimeError(f"ffmpeg mix failed: {detail}")
+
+        return vocals_out, music_out
+
+
+async def separate_many(
+    inputs: list[Path],
+    output_dir: Path,
+    n_workers: int = 2,
+) -> list[tuple[Path, Path]]:
+    """Separate several files concurrently, capped at n_workers subprocesses."""
+    semaphore = asyncio.Semaphore(n_workers)
+
+    async def _one(path: Path) -> tuple[Path, Path]:
+        async with semaphore:
+            return await separate_async(path, output_dir)
+
+    return list(await asyncio.gather(*(_one(path) for path in inputs)))
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Split one audio file into vocals + music using Open-Unmix.")
     parser.add_argument("input_audio", type=Path, help="Path to input audio file (wav/mp3).")
     parser.add_argument("--output-dir", "-o", type=Path, default=Path("./outputs"), help="Directory for outputs.")
+    parser.add_argument(
+        "--chunk-duration",
+        type=int,
+        default=None,
+        help="Split the input into chunks of this many seconds to bound memory.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Skip the on-disk result cache.")
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
     try:
-        vocals_out, music_out = separate(args.input_audio, args.output_dir)
+        vocals_out, music_out = separate(
+            args.input_audio,
+            args.output_dir,
+            use_cache=not args.no_cache,
+            chunk_duration=args.chunk_duration,
+        )
     except Exception as exc:
         print(f"[openunmix] ERROR: {exc}")
         return 1
@@ -17,22 +17,23 @@ class OpenUnmixTests(unittest.TestCase):
             input_audio.write_bytes(b"audio")
             out_dir = tmp_path / "out"
 
-            def fake_run(cmd, *args, **kwargs):
+            def fake_popen(cmd, *args, **kwargs):
                 if cmd and cmd[0] == "umx":
-                    stem_dir = out_dir / "_openunmix_raw" / "song"
+                    outdir = Path(cmd[cmd.index("--outdir") + 1])
+                    stem_dir = outdir / "song"
                     stem_dir.mkdir(parents=True, exist_ok=True)
                     for stem in ["vocals.wav", "drums.wav", "bass.wav", "other.wav"]:
                         (stem_dir / stem).write_bytes(b"x")
-                    return SimpleNamespace(returncode=0, stdout="", stderr="")
+                    return SimpleNamespace(stdout=iter(()), wait=lambda: 0)
                 if cmd and cmd[0] == "ffmpeg":
                     music_out = out_dir / "song" / "music.wav"
                     music_out.parent.mkdir(parents=True, exist_ok=True)
                     music_out.write_bytes(b"m")
-                    return SimpleNamespace(returncode=0, stdout="", stderr="")
-                return SimpleNamespace(returncode=1, stdout="", stderr="unexpected")
+                    return SimpleNamespace(stdout=iter(()), wait=lambda: 0)
+                return SimpleNamespace(stdout=iter(["unexpected\n"]), wait=lambda: 1)
 
             with patch("main.shutil.which", return_value="umx"):
-                with patch("main.subprocess.run", side_effect=fake_run):
+                with patch("_common.subprocess.Popen", side_effect=fake_popen):
                     vocals, music = main.separate(input_audio, out_dir)
 
             self.assertTrue(vocals.exists())
@@ -47,17 +48,18 @@ class OpenUnmixTests(unittest.TestCase):
             input_audio.write_bytes(b"audio")
             out_dir = tmp_path / "out"
 
-            def fake_run(cmd, *args, **kwargs):
+            def fake_popen(cmd, *args, **kwargs):
                 if cmd and cmd[0] == "umx":
-                    stem_dir = out_dir / "_openunmix_raw" / "song"
+                    outdir = Path(cmd[cmd.index("--outdir") + 1])
+                    stem_dir = outdir / "song"
                     stem_dir.mkdir(parents=True, exist_ok=True)
                     for stem in ["vocals.wav", "drums.wav", "bass.wav", "other.wav"]:
                         (stem_dir / stem).write_bytes(b"x")
-                    return SimpleNamespace(returncode=0, stdout="", stderr="")
-                return SimpleNamespace(returncode=1, stdout="", stderr="ffmpeg failed")
+                    return SimpleNamespace(stdout=iter(()), wait=lambda: 0)
+                return SimpleNamespace(stdout=iter(["ffmpeg failed\n"]), wait=lambda: 1)
 
             with patch("main.shutil.which", return_value="umx"):
-                with patch("main.subprocess.run", side_effect=fake_run):
+                with patch("_common.subprocess.Popen", side_effect=fake_popen):
                     with self.assertRaises(RuntimeError):
                         main.separate(input_audio, out_dir)
 
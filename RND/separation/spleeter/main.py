@@ -1,10 +1,37 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
+import os
 import shutil
-import subprocess
 import sys
 from pathlib import Path
+from typing import Any
+
+# The wrappers are standalone uv projects; make the shared modules
+# in RND/separation importable regardless of which one is running.
+_SEPARATION_ROOT = str(Path(__file__).resolve().parents[1])
+if _SEPARATION_ROOT not in sys.path:
+    sys.path.insert(0, _SEPARATION_ROOT)
+
+import _cache
+import _chunking
+import _common
+
+SPLEETER_MODEL = "spleeter:2stems"
+
+
+def _jit_cache_env() -> dict[str, str]:
+    """Child-process environment with TensorFlow XLA JIT enabled.
+
+    XLA fuses the TF graph into compiled kernels; enabling auto-JIT in
+    the child gives the compilation win without touching the spleeter
+    install itself.
+    """
+    env = os.environ.copy()
+    env.setdefault("TF_XLA_FLAGS", "--tf_xla_auto_jit=2")
+    return env
 
 
 def _build_spleeter_cmd(input_audio: Path, out_dir: Path) -> list[str]:
@@ -48,23 +75,41 @@ def _build_spleeter_cmd(input_audio: Path, out_dir: Path) -> list[str]:
     ]
 
 
-def separate(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
-    input_audio = input_audio.resolve()
-    if not input_audio.exists() or not input_audio.is_file():
-        raise FileNotFoundError(f"Input audio not found: {input_audio}")
+@functools.lru_cache(maxsize=1)
+def _cached_separator() -> Any | None:
+    """Load the 2-stems Spleeter separator once per process.
+
+    Importing TensorFlow and building the model graph dominates the cost of
+    a CLI invocation, so when spleeter is importable we keep one loaded
+    instance for the whole process. Returns None when spleeter is absent
+    and the CLI/docker fallback should be used instead.
+    """
+    try:
+        from spleeter.separator import Separator
+    except ImportError:
+        return None
+    return Separator(SPLEETER_MODEL)
+
+
+def _prepare_dirs(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
+    """Validate the input and create the raw output directory."""
+    input_audio = _common.require_file(input_audio)
 
     output_dir.mkdir(parents=True, exist_ok=True)
     spleeter_tmp = (output_dir / "_spleeter_raw").resolve()
     spleeter_tmp.mkdir(parents=True, exist_ok=True)
+    return input_audio, spleeter_tmp
+
 
+def _prepare_run(input_audio: Path, output_dir: Path) -> tuple[Path, Path, list[str]]:
+    """Validate the input, create output dirs, and build the Spleeter command."""
+    input_audio, spleeter_tmp = _prepare_dirs(input_audio, output_dir)
     cmd = _build_spleeter_cmd(input_audio, spleeter_tmp)
+    return input_audio, spleeter_tmp, cmd
 
-    print(f"[spleeter] Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, text=True, capture_output=True)
-    if result.returncode != 0:
-        detail = (result.stderr or result.stdout or "").strip()
-        raise RuntimeError(f"Spleeter separation failed: {detail}")
 
+def _publish_outputs(spleeter_tmp: Path, input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
+    """Locate raw Spleeter stems and publish them under normalized names."""
     stem_dir = spleeter_tmp / input_audio.stem
     vocals_src = stem_dir / "vocals.wav"
     music_src = stem_dir / "accompaniment.wav"
@@ -76,23 +121,108 @@ def separate(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
 
     vocals_out = track_out / "vocals.wav"
     music_out = track_out / "music.wav"
-    shutil.copy2(vocals_src, vocals_out)
-    shutil.copy2(music_src, music_out)
+    _common.publish(vocals_src, vocals_out)
+    _common.publish(music_src, music_out)
 
     return vocals_out, music_out
 
 
+def separate(
+    input_audio: Path,
+    output_dir: Path,
+    use_cache: bool = False,
+    chunk_duration: int | None = None,
+) -> tuple[Path, Path]:
+    if chunk_duration:
+        return _chunking.chunked_separate(
+            input_audio,
+            output_dir,
+            chunk_duration,
+            lambda chunk, out: separate(chunk, out),
+        )
+
+    def _produce() -> tuple[Path, Path]:
+        separator = _cached_separator()
+        if separator is not None:
+            prepared_input, spleeter_tmp = _prepare_dirs(input_audio, output_dir)
+            print(f"[spleeter] Separating in-process with cached {SPLEETER_MODEL} separator")
+            separator.separate_to_file(str(prepared_input), str(spleeter_tmp))
+            return _publish_outputs(spleeter_tmp, prepared_input, output_dir)
+
+        prepared_input, spleeter_tmp, cmd = _prepare_run(input_audio, output_dir)
+
+        print(f"[spleeter] Running: {' '.join(cmd)}")
+        returncode, output = _common.run_capture_tail(cmd, env=_jit_cache_env())
+        if returncode != 0:
+            raise RuntimeError(f"Spleeter separation failed: {output.strip()}")
+
+        return _publish_outputs(spleeter_tmp, prepared_input, output_dir)
+
+    if not use_cache:
+        return _produce()
+
+    input_audio = _common.require_file(input_audio)
+    track_out = output_dir / input_audio.stem
+    return _cache.cached_separate(input_audio, SPLEETER_MODEL, "spleeter", track_out, _produce)
+
+
+async def separate_async(input_audio: Path, output_dir: Path) -> tuple[Path, Path]:
+    """Async variant of separate(): the event loop stays free while Spleeter runs."""
+    input_audio, spleeter_tmp, cmd = _prepare_run(input_audio, output_dir)
+
+    print(f"[spleeter] Running: {' '.join(cmd)}")
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=_jit_cache_env(),
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        detail = (stderr or stdout or b"").decode(errors="replace").strip()
+        raise RuntimeError(f"Spleeter separation failed: {detail}")
+
+    return _publish_outputs(spleeter_tmp, input_audio, output_dir)
+
+
+async def separate_many(
+    inputs: list[Path],
+    output_dir: Path,
+    n_workers: int = 2,
+) -> list[tuple[Path, Path]]:
+    """Separate several files concurrently, capped at n_workers subprocesses."""
+    semaphore = asyncio.Semaphore(n_workers)
+
+    async def _one(path: Path) -> tuple[Path, Path]:
+        async with semaphore:
+            return await separate_async(path, output_dir)
+
+    return list(await asyncio.gather(*(_one(path) for path in inputs)))
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Split one audio file into vocals + music using Spleeter.")
     parser.add_argument("input_audio", type=Path, help="Path to input audio file (wav/mp3).")
     parser.add_argument("--output-dir", "-o", type=Path, default=Path("./outputs"), help="Directory for outputs.")
+    parser.add_argument(
+        "--chunk-duration",
+        type=int,
+        default=None,
+        help="Split the input into chunks of this many seconds to bound memory.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Skip the on-disk result cache.")
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
     try:
-        vocals_out, music_out = separate(args.input_audio, args.output_dir)
+        vocals_out, music_out = separate(
+            args.input_audio,
+            args.output_dir,
+            use_cache=not args.no_cache,
+            chunk_duration=args.chunk_duration,
+        )
     except Exception as exc:
         print(f"[spleeter] ERROR: {exc}")
         return 1
@@ -42,15 +42,15 @@ class SpleeterTests(unittest.TestCase):
             input_audio.write_bytes(b"audio")
             out_dir = tmp_path / "out"
 
-            def fake_run(*args, **kwargs):
+            def fake_popen(*args, **kwargs):
                 stem_dir = (out_dir / "_spleeter_raw" / "song").resolve()
                 stem_dir.mkdir(parents=True, exist_ok=True)
                 (stem_dir / "vocals.wav").write_bytes(b"v")
                 (stem_dir / "accompaniment.wav").write_bytes(b"m")
-                return SimpleNamespace(returncode=0, stdout="", stderr="")
+                return SimpleNamespace(stdout=iter(()), wait=lambda: 0)
 
             with patch("main.shutil.which", side_effect=lambda name: "/usr/local/bin/spleeter" if name == "spleeter" else None):
-                with patch("main.subprocess.run", side_effect=fake_run):
+                with patch("_common.subprocess.Popen", side_effect=fake_popen):
                     vocals, music = main.separate(input_audio, out_dir)
 
             self.assertTrue(vocals.exists())
@@ -66,8 +66,8 @@ class SpleeterTests(unittest.TestCase):
 
             with patch("main.shutil.which", side_effect=lambda name: "/usr/local/bin/spleeter" if name == "spleeter" else None):
                 with patch(
-                    "main.subprocess.run",
-                    return_value=SimpleNamespace(returncode=1, stdout="", stderr="boom"),
+                    "_common.subprocess.Popen",
+                    return_value=SimpleNamespace(stdout=iter(["boom\n"]), wait=lambda: 1),
                 ):
                     with self.assertRaises(RuntimeError):
                         main.separate(input_audio, tmp_path / "out")
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import functools
+import os
+import stat
 from pathlib import Path
 from typing import Optional, Protocol
 import typer
 
 app = typer.Typer(help="Separate vocals from accompaniment using Spleeter.")
 
+AUDIO_SUFFIXES = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+
 
 class SpleeterNotInstalledError(RuntimeError):
     """Raised when Spleeter is not available in the current environment."""
@@ -17,11 +22,16 @@ class SeparatorProtocol(Protocol):
     def separate_to_file(self, audio_descriptor: str, destination: str) -> None: ...
 
 
+@functools.lru_cache(maxsize=4)
 def load_separator(model: str) -> SeparatorProtocol:
     """Load a Spleeter separator for a given model preset.
 
     This function isolates Spleeter imports, so other frameworks can import
     and use the core logic without hard dependencies at import time.
+
+    The separator is cached per model: constructing one rebuilds the full
+    TF graph and reloads weights, which dominates latency for short clips,
+    while a loaded instance can serve any number of separate_to_file calls.
     """
     try:
         from spleeter.separator import Separator
@@ -49,11 +59,16 @@ def separate_audio(
     Returns:
         The resolved output directory containing the separated stems.
     """
-    input_audio = input_audio.expanduser().resolve()
-    if not input_audio.exists():
-        raise FileNotFoundError(f"Input audio does not exist: {input_audio}")
-    if not input_audio.is_file():
+    # Single stat instead of resolve()+exists()+is_file(): each stat can be
+    # an RPC on network mounts, and abspath is pure string work.
+    input_audio = input_audio.expanduser()
+    try:
+        st = input_audio.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input audio does not exist: {input_audio}") from None
+    if not stat.S_ISREG(st.st_mode):
         raise ValueError(f"Input audio must be a file: {input_audio}")
+    input_audio = Path(os.path.abspath(input_audio))
 
     output_dir = output_dir.expanduser().resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -69,9 +84,9 @@ def separate_command(
         ...,
         exists=True,
         file_okay=True,
-        dir_okay=False,
+        dir_okay=True,
         readable=True,
-        help="Path to the input audio file.",
+        help="Path to the input audio file (or a directory with --batch).",
     ),
     output_dir: Path = typer.Option(
         Path("output"),
@@ -87,11 +102,36 @@ def separate_command(
         "-m",
         help="Spleeter model preset (ex: spleeter:2stems, spleeter:4stems).",
     ),
+    batch: bool = typer.Option(
+        False,
+        "--batch",
+        help="Treat input as a directory and separate every audio file in it.",
+    ),
 ) -> None:
     """CLI entrypoint that wraps the core separation function."""
     try:
-        typer.echo(f"Separating {input_audio} using {model}...")
-        output_dir = separate_audio(input_audio=input_audio, output_dir=output_dir, model=model)
+        if batch:
+            if not input_audio.is_dir():
+                raise typer.BadParameter("--batch requires a directory as input.")
+            files = sorted(
+                p for p in input_audio.iterdir()
+                if p.is_file() and p.suffix.lower() in AUDIO_SUFFIXES
+            )
+            if not files:
+                raise typer.BadParameter(f"No audio files found in {input_audio}.")
+            # Load once up front; every file reuses the same cached separator.
+            separator = load_separator(model)
+            for audio_file in files:
+                typer.echo(f"Separating {audio_file} using {model}...")
+                output_dir = separate_audio(
+                    input_audio=audio_file,
+                    output_dir=output_dir,
+                    model=model,
+                    separator=separator,
+                )
+        else:
+            typer.echo(f"Separating {input_audio} using {model}...")
+            output_dir = separate_audio(input_audio=input_audio, output_dir=output_dir, model=model)
     except SpleeterNotInstalledError as exc:
         raise typer.BadParameter(str(exc)) from exc
     typer.echo(f"Done. Stems written to {output_dir}.")
@@ -1,9 +1,11 @@
 import asyncio
+import functools
 import os
+import re
 import sys
+import aiofiles
 import gradium
 from pathlib import Path
-from dotenv import load_dotenv
 
 def _ensure_supported_python() -> None:
     required = (3, 13)
@@ -17,32 +19,68 @@ def _ensure_supported_python() -> None:
         )
 
 
+# One multiline regex pass over each candidate .env instead of the
+# line-by-line python-dotenv parser.
+_DOTENV_RE = re.compile(
+    r"^\s*([A-Z_][A-Z0-9_]*)\s*=\s*['\"]?([^'\"\n]*)['\"]?\s*$", re.MULTILINE
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _dotenv_keys() -> dict[str, str]:
+    """Parse candidate .env files once per process."""
+    keys: dict[str, str] = {}
+    candidates = (
+        Path.cwd() / ".env",
+        Path(__file__).resolve().parent / ".env",
+        Path(__file__).resolve().parents[2] / ".env",
+    )
+    for candidate in candidates:
+        if candidate.is_file():
+            keys.update(_DOTENV_RE.findall(candidate.read_text(encoding="utf-8")))
+    return keys
+
+
+def _load_dotenv_if_needed() -> None:
+    # Skip the file IO entirely when the key is already exported.
+    if os.environ.get("GRADIUM_API_KEY"):
+        return
+    value = _dotenv_keys().get("GRADIUM_API_KEY")
+    if value:
+        os.environ["GRADIUM_API_KEY"] = value
+
+
 _ensure_supported_python()
-load_dotenv()
+_load_dotenv_if_needed()
 
 
-def load_audio_data(audio_path: str) -> bytes:
-    with open(audio_path, "rb") as f:
-        return f.read()
+# Audio generator that streams chunks straight off disk, so file reads,
+# the STT upload and result receive all overlap instead of waiting for
+# the whole file to load up front.
+async def audio_generator(audio_path: Path, chunk_size: int = 1920):
+    async with aiofiles.open(audio_path, "rb") as audio_file:
+        while chunk := await audio_file.read(chunk_size):
+            yield chunk
 
-async def main(audio_data: bytes):
-    client = gradium.client.GradiumClient(api_key=os.getenv("GRADIUM_API_KEY"))
 
-    # Audio generator that yields audio chunks
-    async def audio_generator(audio_data, chunk_size=1920):
-        for i in range(0, len(audio_data), chunk_size):
-            yield audio_data[i : i + chunk_size]
+async def consume_transcripts(stream) -> None:
+    async for message in stream.iter_text():
+        print(message)
 
-    # Create STT stream
+
+async def main(audio_path: Path):
+    client = gradium.client.GradiumClient(api_key=os.getenv("GRADIUM_API_KEY"))
+
+    # Create STT stream fed directly from the file
     stream = await client.stt_stream(
         {"model_name": "default", "input_format": "pcm"},
-        audio_generator(audio_data),
+        audio_generator(audio_path),
     )
 
-    # Process transcription results
-    async for message in stream.iter_text():
-        print(message)
+    # Drain transcription results concurrently with the audio upload
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(consume_transcripts(stream))
 
 if __name__ == "__main__":
     path_to_audio = Path(__file__).parent / "data" / "input" / "vocals.wav"
-    asyncio.run(main(load_audio_data(path_to_audio)))
\ No newline at end of file
+    asyncio.run(main(path_to_audio))
\ No newline at end of file
@@ -3,31 +3,45 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
+import heapq
+import json
 import logging
+import os
 import shutil
 import tempfile
 import time
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Annotated, cast
-from uuid import uuid4
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+import aiofiles
+from fastapi import APIRouter, File, HTTPException, Request, Response, UploadFile
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
 from app.config import Settings
 from app.models import LyricsTimestamp, ProcessJobResponse, ProcessResponse
 from app.services.downloader import DownloadError, download_audio
+from app.services.hashing import new_cache_hasher
 from app.services.separator import SeparationError, separate
 from app.services.transcriber import TranscriptionError, transcribe
 
 logger = logging.getLogger(__name__)
 
-ALLOWED_EXTENSIONS = {".mp3", ".wav"}
+ALLOWED_EXTENSIONS = frozenset({"mp3", "wav"})
 ALLOWED_MIME_PREFIX = "audio/"
 
+# 1 MB keeps memory flat while amortizing the per-await overhead of the
+# upload read loop on fast connections; small enough that the loop still
+# yields regularly on slow ones.
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+# Bound once at import so the per-segment assembly loops below skip both
+# validation and the classmethod attribute lookup on every row.
+_lyrics_construct = LyricsTimestamp.model_construct
+
 
 @dataclass
 class StoredJob:
@@ -42,6 +56,7 @@ class BackgroundJob:
     """Tracks the state of an asynchronous URL processing job."""
 
     job_id: str
+    source_url: str = ""
     status: str = "queued"  # queued | processing | done | error
     error: str | None = None
     result: ProcessResponse | None = None
@@ -57,125 +72,310 @@ class UrlPayload(BaseModel):
 router = APIRouter(prefix="/api", tags=["api"])
 
 
+def _blob_dir(cas_root: Path, file_hash: str) -> Path:
+    """Resolve the sharded blob directory for an algorithm-prefixed key."""
+
+    algo, _, digest = file_hash.partition(":")
+    return cas_root / algo / digest[:2] / digest[2:]
+
+
+def _cas_root(settings: Settings) -> Path:
+    """Root of the content-addressed store for separated outputs."""
+
+    if settings.cas_dir:
+        return Path(settings.cas_dir)
+    return Path(tempfile.gettempdir()) / "sge-cas"
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst, copying when the link is not possible."""
+
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _promote_blobs_to_cas(job_dir: Path, file_hash: str, cas_root: Path) -> None:
+    """Hardlink finished stems into the content-addressed store.
+
+    TTL eviction only removes the job dir's links; the blobs survive, so
+    an identical upload after eviction restores instantly instead of
+    re-running separation and transcription. Blobs are published with
+    the link-then-rename pattern so readers never see partial files.
+    """
+
+    blob_dir = _blob_dir(cas_root, file_hash)
+    try:
+        blob_dir.mkdir(parents=True, exist_ok=True)
+        for name in ("vocals.wav", "instrumental.wav"):
+            blob_path = blob_dir / name
+            if blob_path.exists():
+                continue
+            tmp_path = blob_dir / f".{name}.tmp"
+            _link_or_copy(job_dir / name, tmp_path)
+            os.replace(tmp_path, blob_path)
+    except OSError:
+        logger.exception("Failed to promote stems to the CAS store")
+
+
+def _write_cas_response(file_hash: str, response_json: bytes, cas_root: Path) -> None:
+    """Persist the serialized response next to the CAS blobs."""
+
+    blob_dir = _blob_dir(cas_root, file_hash)
+    try:
+        blob_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = blob_dir / ".response.json.tmp"
+        tmp_path.write_bytes(response_json)
+        os.replace(tmp_path, blob_dir / "response.json")
+    except OSError:
+        logger.exception("Failed to write the CAS response record")
+
+
+def _restore_from_cas(
+    job_dir: Path, job_id: str, file_hash: str, cas_root: Path
+) -> ProcessResponse | None:
+    """Rebuild a job from CAS blobs, or None when the hash is unknown."""
+
+    blob_dir = _blob_dir(cas_root, file_hash)
+    names = ("vocals.wav", "instrumental.wav", "response.json")
+    if not all((blob_dir / name).exists() for name in names):
+        return None
+
+    try:
+        raw = json.loads((blob_dir / "response.json").read_text(encoding="utf-8"))
+        _link_or_copy(blob_dir / "vocals.wav", job_dir / "vocals.wav")
+        _link_or_copy(blob_dir / "instrumental.wav", job_dir / "instrumental.wav")
+    except (OSError, ValueError):
+        return None
+
+    raw["job_id"] = job_id
+    raw["vocals_url"] = f"/api/files/{job_id}/vocals.wav"
+    raw["instrumental_url"] = f"/api/files/{job_id}/instrumental.wav"
+    return ProcessResponse.model_validate(raw)
+
+
+def _store_job(
+    jobs: dict[int | str, StoredJob],
+    job_expirations: list[tuple[float, int | str]],
+    job_key: int | str,
+    job_dir: Path,
+    ttl: float,
+) -> None:
+    """Register a finished job and schedule its expiry on the min-heap.
+
+    The heap lets the cleanup sweep pop only actually-expired entries
+    instead of scanning every live job each wake.
+    """
+
+    created_at = time.time()
+    jobs[job_key] = StoredJob(path=job_dir, created_at=created_at)
+    heapq.heappush(job_expirations, (created_at + ttl, job_key))
+
+
+def _job_key(job_id: str) -> int | str:
+    """Map a job_id path parameter to its key in the jobs table.
+
+    Jobs are keyed by the 128-bit UUID integer rather than the 36-char
+    hex string: the int hashes cheaper and malformed ids fail the UUID
+    parse before ever probing the table with a user-controlled string.
+    Non-UUID ids (the demo job) pass through unchanged.
+    """
+
+    try:
+        return UUID(job_id).int
+    except ValueError:
+        return job_id
+
+
 def _validate_upload(file: UploadFile, settings: Settings) -> None:
     """Validate file extension and MIME type for uploaded audio files."""
 
+    # rpartition avoids the PurePath allocation of Path(...).suffix, and a
+    # fixed-width slice compare beats startswith on this hot path.
     filename = file.filename or ""
-    extension = Path(filename).suffix.lower()
-    if extension not in ALLOWED_EXTENSIONS:
+    if filename.rpartition(".")[2].lower() not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Unsupported file format. Use .mp3 or .wav.")
 
     content_type = file.content_type or ""
-    if not content_type.startswith(ALLOWED_MIME_PREFIX):
+    if content_type[:6] != ALLOWED_MIME_PREFIX:
         raise HTTPException(status_code=400, detail="Unsupported content type. Audio files only.")
 
-    if file.size is not None and file.size > settings.upload_max_mb * 1024 * 1024:
+    if file.size is not None and file.size > settings.upload_max_bytes:
         raise HTTPException(
             status_code=400,
             detail=f"File exceeds maximum size of {settings.upload_max_mb}MB.",
         )
 
 
-def _cleanup_expired_jobs(request: Request) -> None:
-    """Remove expired job directories from in-memory job store."""
-
-    settings: Settings = request.app.state.settings
-    jobs: dict[str, StoredJob] = request.app.state.jobs
-    now = time.time()
-    expired = [
-        job_id
-        for job_id, job in jobs.items()
-        if (
-            now - job.created_at > settings.job_ttl_seconds
-            and job_id != getattr(request.app.state, "demo_job_id", None)
-        )
-    ]
-    for job_id in expired:
-        job = jobs.pop(job_id)
-        if job.path.exists():
-            shutil.rmtree(job.path, ignore_errors=True)
-
-
 @router.post("/process", response_model=ProcessResponse)
 async def process_audio(
     request: Request,
     file: Annotated[UploadFile, File(...)],
-) -> ProcessResponse:
+) -> ProcessResponse | Response:
     """Upload, separate, transcribe, and return lyrics with output URLs."""
 
     settings: Settings = request.app.state.settings
     _validate_upload(file, settings)
-    _cleanup_expired_jobs(request)
-
-    data = await file.read()
-    if len(data) > settings.upload_max_mb * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File exceeds maximum size of {settings.upload_max_mb}MB.",
-        )
-
-    file_hash = hashlib.sha256(data).hexdigest()
-    jobs: dict[str, StoredJob] = request.app.state.jobs
-    cache: dict[str, tuple[str, ProcessResponse]] = request.app.state.cache
-    cached = cache.get(file_hash)
-    if cached is not None:
-        cached_job_id, cached_response = cached
-        cached_job = jobs.get(cached_job_id)
-        if cached_job is not None:
-            vocals_path = cached_job.path / "vocals.wav"
-            instrumental_path = cached_job.path / "instrumental.wav"
-            if vocals_path.exists() and instrumental_path.exists():
-                cached_job.created_at = time.time()
-                return cached_response
-        cache.pop(file_hash, None)
-
-    if not settings.gradium_api_key.strip():
-        raise HTTPException(status_code=500, detail="GRADIUM_API_KEY is missing.")
 
-    job_id = str(uuid4())
+    max_bytes = settings.upload_max_bytes
+    job_uuid = uuid4()
+    job_id = str(job_uuid)
+    job_key = job_uuid.int
     job_dir = Path(tempfile.mkdtemp(prefix=f"sge-{job_id}-"))
-    input_path = job_dir / (file.filename or "input.wav")
-    input_path.write_bytes(data)
+    # The input is read exactly once (by the separator), so stage it on
+    # tmpfs when available: the upload then never touches the block
+    # device. Outputs still land in job_dir on disk because they are
+    # served for the whole job TTL.
+    shm = Path("/dev/shm")
+    input_dir = Path(
+        tempfile.mkdtemp(prefix=f"sge-in-{job_id}-", dir=str(shm) if shm.is_dir() else None)
+    )
+    input_path = input_dir / (file.filename or "input.wav")
 
     try:
-        separation_result = await separate(
-            input_path=input_path,
-            output_dir=job_dir,
-            model=settings.demucs_model,
-            device=settings.demucs_device,
-        )
-        transcription = await transcribe(
-            audio_path=separation_result.vocals_path,
-            api_key=settings.gradium_api_key,
-        )
-    except SeparationError as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-    except TranscriptionError as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-
-    response = ProcessResponse(
-        job_id=job_id,
-        lyrics=transcription.text,
-        lyrics_with_timestamps=[
-            LyricsTimestamp(text=seg.text, start_s=seg.start_s, stop_s=seg.stop_s)
-            for seg in transcription.segments
-        ],
-        vocals_url=f"/api/files/{job_id}/vocals.wav",
-        instrumental_url=f"/api/files/{job_id}/instrumental.wav",
-    )
-    request.app.state.jobs[job_id] = StoredJob(path=job_dir, created_at=time.time())
-    cache[file_hash] = (job_id, response)
-    return response
+        # Hash and persist the upload in chunks: memory stays constant
+        # regardless of file size, and hashing/disk writes overlap the ongoing
+        # network receive instead of starting after it finishes. The digest is
+        # a cache key, not an integrity check, so the fastest available
+        # non-cryptographic-grade hasher wins.
+        hasher, hash_algo = new_cache_hasher(settings.cache_hash)
+        received = 0
+        try:
+            async with aiofiles.open(input_path, "wb") as out_file:
+                while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                    received += len(chunk)
+                    if received > max_bytes:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File exceeds maximum size of {settings.upload_max_mb}MB.",
+                        )
+                    hasher.update(chunk)
+                    await out_file.write(chunk)
+        except HTTPException:
+            await asyncio.to_thread(shutil.rmtree, job_dir, ignore_errors=True)
+            raise
+
+        file_hash = f"{hash_algo}:{hasher.hexdigest()}"
+        jobs: dict[int | str, StoredJob] = request.app.state.jobs
+        cache: dict[str, tuple[int | str, ProcessResponse, bytes]] = request.app.state.cache
+        cached = cache.get(file_hash)
+        if cached is not None:
+            cached_job_key, _cached_response, cached_bytes = cached
+            cached_job = jobs.get(cached_job_key)
+            if cached_job is not None:
+                vocals_path = cached_job.path / "vocals.wav"
+                instrumental_path = cached_job.path / "instrumental.wav"
+                if vocals_path.exists() and instrumental_path.exists():
+                    cached_job.created_at = time.time()
+                    await asyncio.to_thread(shutil.rmtree, job_dir, ignore_errors=True)
+                    # Serve the bytes serialized when the job first completed;
+                    # a hit costs no Pydantic validation or json.dumps work.
+                    return Response(content=cached_bytes, media_type="application/json")
+            cache.pop(file_hash, None)
+
+        # The in-memory entry may be gone (TTL eviction, restart) while the
+        # blobs still exist; rebuild the job from the CAS store if so.
+        cas_root = _cas_root(settings)
+        restored = await asyncio.to_thread(_restore_from_cas, job_dir, job_id, file_hash, cas_root)
+        job_expirations: list[tuple[float, int | str]] = request.app.state.job_expirations
+        if restored is not None:
+            restored_bytes = restored.model_dump_json().encode("utf-8")
+            _store_job(jobs, job_expirations, job_key, job_dir, settings.job_ttl_seconds)
+            cache[file_hash] = (job_key, restored, restored_bytes)
+            return Response(content=restored_bytes, media_type="application/json")
+
+        # A duplicate upload may already be mid-separation; piggyback on its
+        # result instead of running Demucs and transcription twice.
+        in_flight: dict[str, asyncio.Future[ProcessResponse]] = request.app.state.in_flight
+        pending = in_flight.get(file_hash)
+        if pending is not None:
+            await asyncio.to_thread(shutil.rmtree, job_dir, ignore_errors=True)
+            return await pending
+
+        future: asyncio.Future[ProcessResponse] = asyncio.get_running_loop().create_future()
+        in_flight[file_hash] = future
+        try:
+            if not settings.gradium_api_key.strip():
+                await asyncio.to_thread(shutil.rmtree, job_dir, ignore_errors=True)
+                raise HTTPException(status_code=500, detail="GRADIUM_API_KEY is missing.")
+
+            try:
+                demucs_sem: asyncio.Semaphore = request.app.state.demucs_sem
+                async with demucs_sem:
+                    separation_result = await separate(
+                        input_path=input_path,
+                        output_dir=job_dir,
+                        model=settings.demucs_model,
+                        device=settings.demucs_device,
+                        executor=request.app.state.cpu_pool,
+                    )
+                # The stems are final as soon as separation returns;
+                # hardlink them into the CAS store while the transcription
+                # round trip is in flight instead of after it.
+                promote_task = asyncio.create_task(
+                    asyncio.to_thread(_promote_blobs_to_cas, job_dir, file_hash, cas_root)
+                )
+                try:
+                    transcription = await transcribe(
+                        audio_path=separation_result.vocals_path,
+                        api_key=settings.gradium_api_key,
+                    )
+                finally:
+                    await promote_task
+            except SeparationError as exc:
+                raise HTTPException(status_code=500, detail=str(exc)) from exc
+            except TranscriptionError as exc:
+                raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+            response = ProcessResponse(
+                job_id=job_id,
+                lyrics=transcription.text,
+                # model_construct skips per-field validation, which is safe
+                # here: the segments come from our own transcriber dataclasses.
+                lyrics_with_timestamps=[
+                    _lyrics_construct(text=seg.text, start_s=seg.start_s, stop_s=seg.stop_s)
+                    for seg in transcription.segments
+                ],
+                vocals_url=f"/api/files/{job_id}/vocals.wav",
+                instrumental_url=f"/api/files/{job_id}/instrumental.wav",
+            )
+            # Serialize exactly once; the CAS record, the cache entry and
+            # this response all reuse the same bytes.
+            serialized = response.model_dump_json().encode("utf-8")
+            _store_job(jobs, job_expirations, job_key, job_dir, settings.job_ttl_seconds)
+            cache[file_hash] = (job_key, response, serialized)
+            await asyncio.to_thread(_write_cas_response, file_hash, serialized, cas_root)
+            future.set_result(response)
+            return Response(content=serialized, media_type="application/json")
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved so a failure with no duplicate
+            # waiter does not log "exception was never retrieved".
+            future.exception()
+            raise
+        finally:
+            in_flight.pop(file_hash, None)
+            # The except above misses CancelledError (a BaseException): if
+            # the primary uploader disconnects mid-separation, cancel the
+            # future too so parked duplicates wake up and can retry instead
+            # of awaiting a forever-pending future.
+            if not future.done():
+                future.cancel()
+    finally:
+        # The staged input is never needed once processing (or any early
+        # return) is done; on tmpfs this releases RAM immediately.
+        await asyncio.to_thread(shutil.rmtree, input_dir, ignore_errors=True)
 
 
 @router.get("/demo", response_model=ProcessResponse)
-async def get_demo(request: Request) -> ProcessResponse:
+async def get_demo(request: Request) -> Response:
     """Return pre-seeded demo processing results when available."""
 
-    demo_response = cast(ProcessResponse | None, getattr(request.app.state, "demo_response", None))
-    if demo_response is None:
+    demo_bytes = cast(bytes | None, getattr(request.app.state, "demo_response_bytes", None))
+    if demo_bytes is None:
         raise HTTPException(status_code=404, detail="Demo data not available.")
-    return demo_response
+    return Response(content=demo_bytes, media_type="application/json")
 
 
 @router.get("/files/{job_id}/{filename}")
@@ -185,16 +385,33 @@ async def get_file(job_id: str, filename: str, request: Request) -> FileResponse
     if filename not in {"vocals.wav", "instrumental.wav"}:
         raise HTTPException(status_code=404, detail="Requested file is not available.")
 
-    jobs: dict[str, StoredJob] = request.app.state.jobs
-    job = jobs.get(job_id)
+    jobs: dict[int | str, StoredJob] = request.app.state.jobs
+    job = jobs.get(_job_key(job_id))
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found.")
 
     file_path = job.path / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found.")
-
-    return FileResponse(path=file_path, media_type="audio/wav", filename=filename)
+    # The demo files never change; reuse the stat result pinned at startup
+    # instead of paying a syscall on every demo request.
+    demo_stats: dict[str, os.stat_result] = getattr(request.app.state, "demo_file_stats", {})
+    if job_id == getattr(request.app.state, "demo_job_id", None) and filename in demo_stats:
+        stat_result = demo_stats[filename]
+    else:
+        try:
+            stat_result = await asyncio.to_thread(os.stat, file_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found.") from None
+
+    # Passing the stat result lets FileResponse skip its own stat and
+    # emit Content-Length/ETag/Last-Modified immediately; Starlette then
+    # handles Accept-Ranges/206 for <audio> seeking and hands the file to
+    # the server's zero-copy pathsend extension when available.
+    return FileResponse(
+        path=file_path,
+        media_type="audio/wav",
+        filename=filename,
+        stat_result=stat_result,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -206,7 +423,11 @@ async def _process_url_background(
     job: BackgroundJob,
     url: str,
     settings: Settings,
-    jobs: dict[str, StoredJob],
+    jobs: dict[int | str, StoredJob],
+    job_expirations: list[tuple[float, int | str]],
+    demucs_sem: asyncio.Semaphore,
+    cpu_pool: Executor,
+    io_pool: Executor,
 ) -> None:
     """Download YouTube audio, separate stems, transcribe – all in background."""
 
@@ -217,16 +438,18 @@ async def _process_url_background(
         job.status = "processing"
 
         # 1. Download audio from YouTube
-        dl_result = await download_audio(url, job_dir)
+        dl_result = await download_audio(url, job_dir, executor=io_pool)
         input_path = dl_result.audio_path
 
         # 2. Separate vocals / instrumental
-        separation_result = await separate(
-            input_path=input_path,
-            output_dir=job_dir,
-            model=settings.demucs_model,
-            device=settings.demucs_device,
-        )
+        async with demucs_sem:
+            separation_result = await separate(
+                input_path=input_path,
+                output_dir=job_dir,
+                model=settings.demucs_model,
+                device=settings.demucs_device,
+                executor=cpu_pool,
+            )
 
         # 3. Transcribe vocals
         transcription = await transcribe(
@@ -238,14 +461,14 @@ async def _process_url_background(
             job_id=job_id,
             lyrics=transcription.text,
             lyrics_with_timestamps=[
-                LyricsTimestamp(text=seg.text, start_s=seg.start_s, stop_s=seg.stop_s)
+                _lyrics_construct(text=seg.text, start_s=seg.start_s, stop_s=seg.stop_s)
                 for seg in transcription.segments
             ],
             vocals_url=f"/api/files/{job_id}/vocals.wav",
             instrumental_url=f"/api/files/{job_id}/instrumental.wav",
         )
 
-        jobs[job_id] = StoredJob(path=job_dir, created_at=time.time())
+        _store_job(jobs, job_expirations, UUID(job_id).int, job_dir, settings.job_ttl_seconds)
         job.result = response
         job.status = "done"
 
@@ -276,16 +499,29 @@ async def process_audio_from_url(
     if not settings.gradium_api_key.strip():
         raise HTTPException(status_code=500, detail="GRADIUM_API_KEY is missing.")
 
-    _cleanup_expired_jobs(request)
+    background_jobs: dict[str, BackgroundJob] = request.app.state.background_jobs
+    stored_jobs: dict[int | str, StoredJob] = request.app.state.jobs
 
-    job_id = str(uuid4())
-    bg_job = BackgroundJob(job_id=job_id)
+    # Same dedup semantics as uploads: a URL already queued or being
+    # processed is returned as-is rather than downloaded again.
+    for existing in background_jobs.values():
+        if existing.source_url == payload.url and existing.status in ("queued", "processing"):
+            return ProcessJobResponse(job_id=existing.job_id, status=existing.status)
 
-    background_jobs: dict[str, BackgroundJob] = request.app.state.background_jobs
-    stored_jobs: dict[str, StoredJob] = request.app.state.jobs
+    job_id = str(uuid4())
+    bg_job = BackgroundJob(job_id=job_id, source_url=payload.url)
 
     bg_job.task = asyncio.create_task(
-        _process_url_background(bg_job, payload.url, settings, stored_jobs),
+        _process_url_background(
+            bg_job,
+            payload.url,
+            settings,
+            stored_jobs,
+            request.app.state.job_expirations,
+            request.app.state.demucs_sem,
+            request.app.state.cpu_pool,
+            request.app.state.io_pool,
+        ),
     )
     background_jobs[job_id] = bg_job
 
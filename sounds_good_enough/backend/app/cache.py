@@ -0,0 +1,100 @@
+"""Bounded LRU mapping for the in-memory job and response caches."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_MISSING: Any = object()
+
+
+class LRUCache(OrderedDict[K, V]):
+    """Size-capped dict that evicts the least recently used entry.
+
+    Reads through get() refresh recency. When an insert pushes the size
+    past maxsize, the oldest entry is dropped and handed to on_evict so
+    callers can release resources tied to it (e.g. a job directory).
+    Because inserts append and accesses move entries to the end,
+    iteration order stays oldest-first.
+
+    With a ttl, entries older than ttl seconds are dropped on access, so
+    a stale response can never outlive the files it points at. Pinned
+    keys are exempt from both size eviction and expiry.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        on_evict: Callable[[K, V], None] | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._on_evict = on_evict
+        self._written: dict[K, float] = {}
+        self._pinned: set[K] = set()
+
+    def __setitem__(self, key: K, value: V) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        self._written[key] = time.monotonic()
+        while len(self) > self.maxsize:
+            old_key = next(iter(self))
+            if old_key in self._pinned:
+                if len(self._pinned) >= len(self):
+                    break
+                self.move_to_end(old_key)
+                continue
+            old_value = self[old_key]
+            del self[old_key]
+            if self._on_evict is not None:
+                self._on_evict(old_key, old_value)
+
+    def __delitem__(self, key: K) -> None:
+        super().__delitem__(key)
+        self._written.pop(key, None)
+        self._pinned.discard(key)
+
+    # dict.pop/popitem bypass __delitem__ at the C level, so without these
+    # overrides every popped key would leak its _written/_pinned entry.
+    def pop(self, key: K, default: Any = _MISSING) -> Any:
+        if default is _MISSING:
+            value = super().pop(key)
+        else:
+            value = super().pop(key, default)
+        self._written.pop(key, None)
+        self._pinned.discard(key)
+        return value
+
+    def popitem(self, last: bool = True) -> tuple[K, V]:
+        key, value = super().popitem(last)
+        self._written.pop(key, None)
+        self._pinned.discard(key)
+        return key, value
+
+    def clear(self) -> None:
+        super().clear()
+        self._written.clear()
+        self._pinned.clear()
+
+    def get(self, key: K, default: V | None = None) -> V | None:  # type: ignore[override]
+        if key in self:
+            if (
+                self.ttl is not None
+                and key not in self._pinned
+                and time.monotonic() - self._written[key] >= self.ttl
+            ):
+                del self[key]
+                return default
+            self.move_to_end(key)
+        return super().get(key, default)
+
+    def pin(self, key: K) -> None:
+        """Exempt a key from eviction and expiry (e.g. the demo entry)."""
+
+        self._pinned.add(key)
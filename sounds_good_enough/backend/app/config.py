@@ -2,8 +2,16 @@
 
 from __future__ import annotations
 
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+import json
+import re
+from functools import cached_property, lru_cache
+from typing import Annotated
+
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+# Precompiled once: splitting on "," and trimming whitespace in one pass.
+_CORS_SPLIT = re.compile(r"\s*,\s*")
 
 
 class Settings(BaseSettings):
@@ -11,11 +19,36 @@ class Settings(BaseSettings):
 
     gradium_api_key: str = Field("", alias="GRADIUM_API_KEY")
     demucs_model: str = "htdemucs"
-    demucs_device: str = "cpu"
+    demucs_device: str = "auto"
+    demucs_max_concurrency: int = 1
     upload_max_mb: int = 50
+    cache_hash: str = "blake3"
+    cas_dir: str = ""
+    cache_max_entries: int = 1024
     job_ttl_seconds: int = 1800
     cleanup_interval_seconds: int = 300
-    cors_origins: list[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
+    cors_origins: Annotated[list[str], NoDecode] = [
+        "http://localhost:5173",
+        "http://127.0.0.1:5173",
+    ]
+
+    @field_validator("cors_origins", mode="before")
+    @classmethod
+    def _parse_cors_origins(cls, value: object) -> object:
+        """Accept a plain comma-separated origin list alongside JSON."""
+
+        if isinstance(value, str):
+            stripped = value.strip()
+            if stripped.startswith("["):
+                return json.loads(stripped)
+            return [origin for origin in _CORS_SPLIT.split(stripped) if origin]
+        return value
+
+    @cached_property
+    def upload_max_bytes(self) -> int:
+        """Upload size cap in bytes, derived once from upload_max_mb."""
+
+        return self.upload_max_mb * 1024 * 1024
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -25,7 +58,18 @@ class Settings(BaseSettings):
     )
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Return app settings loaded from environment variables."""
+    """Return app settings loaded from environment variables.
+
+    Memoized: the .env read and field validation run once per process,
+    and every caller shares the same Settings identity.
+    """
 
     return Settings()  # type: ignore[call-arg]
+
+
+def reset_settings() -> None:
+    """Drop the memoized settings (for tests that mutate the environment)."""
+
+    get_settings.cache_clear()
@@ -4,75 +4,164 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-import hashlib
-import json
+import heapq
+import logging
+import os
 import shutil
 import time
 from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, cast
 
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.routes import BackgroundJob, StoredJob, router
+from app.cache import LRUCache
 from app.config import Settings, get_settings
+from app.services.hashing import hash_file
 
 if TYPE_CHECKING:
     from app.models import ProcessResponse
 
+# libuv-backed event loop: cuts per-task overhead for the many small
+# to_thread hand-offs this backend performs. No-op where unavailable.
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - depends on the installed extras
+    pass
+else:
+    uvloop.install()
+
+logger = logging.getLogger(__name__)
+
 DEMO_JOB_ID = "demo-song"
 DEMO_DIR = Path(__file__).resolve().parents[1] / "demo_data"
 
+# Preference order for the demo source file used to seed the cache key.
+DEMO_SOURCE_CANDIDATES = ("input.wav", "input.mp3", "source.wav", "source.mp3")
+
 
 def _load_demo_data(app: FastAPI) -> None:
     """Load optional pre-seeded demo response and register it in app state."""
 
-    from app.models import ProcessResponse
+    from app.models import LyricsTimestamp, ProcessResponse
 
     response_path = DEMO_DIR / "response.json"
     if not response_path.exists():
         return
 
-    raw = json.loads(response_path.read_text(encoding="utf-8"))
+    raw = orjson.loads(response_path.read_bytes())
     if not isinstance(raw, dict):
         return
 
     file_hash = raw.pop("file_hash", None)
-    response = ProcessResponse.model_validate(raw)
+    # The demo file ships with the app, so skip per-field validation and
+    # construct directly; fall back to the validating path if its shape
+    # ever drifts from the model.
+    try:
+        response = ProcessResponse.model_construct(
+            job_id=raw["job_id"],
+            lyrics=raw["lyrics"],
+            lyrics_with_timestamps=[
+                LyricsTimestamp.model_construct(**seg) for seg in raw["lyrics_with_timestamps"]
+            ],
+            vocals_url=raw["vocals_url"],
+            instrumental_url=raw["instrumental_url"],
+        )
+    except (KeyError, TypeError):
+        response = ProcessResponse.model_validate(raw)
+    # The demo payload never changes: serialize it once here so /demo and
+    # cache hits serve fixed bytes with no per-request Pydantic work.
+    response_bytes = response.model_dump_json().encode("utf-8")
     app.state.jobs[DEMO_JOB_ID] = StoredJob(path=DEMO_DIR, created_at=time.time())
+    # Pin alongside the cache entry below: without this, 1024 distinct
+    # jobs would LRU the demo mapping out and its file URLs would 404.
+    app.state.jobs.pin(DEMO_JOB_ID)
     app.state.demo_response = response
+    app.state.demo_response_bytes = response_bytes
+    # The demo files are immutable, so stat them once here and let
+    # get_file serve them without a per-request syscall.
+    app.state.demo_file_stats = {
+        name: os.stat(DEMO_DIR / name)
+        for name in ("vocals.wav", "instrumental.wav")
+        if (DEMO_DIR / name).exists()
+    }
 
     if isinstance(file_hash, str) and file_hash.strip():
-        app.state.cache[file_hash.strip()] = (DEMO_JOB_ID, response)
+        app.state.cache[file_hash.strip()] = (DEMO_JOB_ID, response, response_bytes)
+        app.state.cache.pin(file_hash.strip())
         return
 
-    for candidate in ("input.wav", "input.mp3", "source.wav", "source.mp3"):
-        source_path = DEMO_DIR / candidate
-        if source_path.exists():
-            app.state.cache[hashlib.sha256(source_path.read_bytes()).hexdigest()] = (DEMO_JOB_ID, response)
+    # One scandir pass instead of a stat per candidate name.
+    with os.scandir(DEMO_DIR) as entries:
+        present = {e.name for e in entries if e.name in DEMO_SOURCE_CANDIDATES and e.is_file()}
+    for candidate in DEMO_SOURCE_CANDIDATES:
+        if candidate in present:
+            # Must match the key computed for uploads in routes.process_audio.
+            file_hash = hash_file(DEMO_DIR / candidate, app.state.settings.cache_hash)
+            app.state.cache[file_hash] = (DEMO_JOB_ID, response, response_bytes)
+            app.state.cache.pin(file_hash)
             break
 
 
+async def _sweep_expired_jobs(
+    jobs: dict[int | str, StoredJob],
+    heap: list[tuple[float, int | str]],
+    ttl: float,
+) -> None:
+    """Delete expired job directories without blocking the event loop.
+
+    This is the only place jobs are expired: request handlers never scan
+    the job table, so a stale job with gigabytes of output can no longer
+    add latency to an unrelated upload. Expiries come off a min-heap, so
+    each wake pops only the k actually-expired entries instead of
+    scanning every live job. Heap entries are validated lazily: a job
+    already gone (LRU eviction) is skipped, and one whose created_at was
+    refreshed by a cache hit is re-pushed with its new deadline.
+    """
+
+    now = time.time()
+    doomed: list[Path] = []
+    while heap and heap[0][0] <= now:
+        _expires_at, job_key = heapq.heappop(heap)
+        job = jobs.get(job_key)
+        if job is None:
+            continue
+        refreshed_deadline = job.created_at + ttl
+        if refreshed_deadline > now:
+            heapq.heappush(heap, (refreshed_deadline, job_key))
+            continue
+        del jobs[job_key]
+        if job.path.exists():
+            doomed.append(job.path)
+    # Tear the trees down concurrently in worker threads: a mass expiry
+    # then costs one slowest-removal instead of the sum of all of them.
+    if doomed:
+        await asyncio.gather(
+            *(asyncio.to_thread(shutil.rmtree, path, ignore_errors=True) for path in doomed)
+        )
+
+
 async def _cleanup_loop(app: FastAPI) -> None:
     """Periodically delete expired job directories."""
 
+    # Hoist the State attribute chains (each read goes through State's
+    # __getattr__) out of the loop; none of these change at runtime.
+    settings = app.state.settings
+    interval = settings.cleanup_interval_seconds
+    ttl = settings.job_ttl_seconds
+    jobs = cast(dict[int | str, StoredJob], app.state.jobs)
+    heap = cast(list[tuple[float, int | str]], app.state.job_expirations)
     while True:
-        await asyncio.sleep(app.state.settings.cleanup_interval_seconds)
-        now = time.time()
-        jobs = cast(dict[str, StoredJob], app.state.jobs)
-        expired = [
-            job_id
-            for job_id, job in jobs.items()
-            if (
-                now - job.created_at > app.state.settings.job_ttl_seconds
-                and job_id != cast(str | None, app.state.demo_job_id)
-            )
-        ]
-        for job_id in expired:
-            job = jobs.pop(job_id)
-            if job.path.exists():
-                shutil.rmtree(job.path, ignore_errors=True)
+        await asyncio.sleep(interval)
+        try:
+            await _sweep_expired_jobs(jobs, heap, ttl)
+        except Exception:
+            logger.exception("Expired-job cleanup sweep failed")
 
 
 @contextlib.asynccontextmanager
@@ -81,11 +170,49 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     if not hasattr(app.state, "settings"):
         app.state.settings = get_settings()
-    app.state.jobs = cast(dict[str, StoredJob], {})
-    app.state.background_jobs = cast(dict[str, BackgroundJob], {})
-    app.state.cache = cast(dict[str, tuple[str, "ProcessResponse"]], {})
+
+    def _evict_job(job_id: int | str, job: StoredJob) -> None:
+        """Delete the directory of an LRU-evicted job (never the demo's)."""
+
+        if job_id == DEMO_JOB_ID or not job.path.exists():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            shutil.rmtree(job.path, ignore_errors=True)
+        else:
+            loop.create_task(asyncio.to_thread(shutil.rmtree, job.path, ignore_errors=True))
+
+    # Size-capped LRU maps: a batch uploader feeding thousands of files
+    # can no longer grow app state (and the disk behind it) without bound.
+    max_entries = app.state.settings.cache_max_entries
+    # Completed jobs are keyed by the 128-bit UUID int (the demo job by
+    # its fixed string id); see routes._job_key.
+    app.state.jobs = cast(dict[int | str, StoredJob], LRUCache(max_entries, on_evict=_evict_job))
+    app.state.background_jobs = cast(dict[str, BackgroundJob], LRUCache(max_entries))
+    app.state.cache = cast(
+        dict[str, tuple[int | str, "ProcessResponse", bytes]],
+        LRUCache(max_entries, ttl=float(app.state.settings.job_ttl_seconds)),
+    )
+    app.state.in_flight = cast("dict[str, asyncio.Future[ProcessResponse]]", {})
+    # Min-heap of (deadline, job key) consumed by the cleanup sweep. The
+    # demo job is never pushed here and so never expires.
+    app.state.job_expirations = cast(list[tuple[float, int | str]], [])
+    # Queue excess separations at the Python layer instead of letting
+    # concurrent Demucs runs thrash (or OOM) a single GPU.
+    app.state.demucs_sem = asyncio.Semaphore(app.state.settings.demucs_max_concurrency)
+    # Dedicated pools: Demucs gets exactly demucs_max_concurrency worker
+    # threads while downloads share a small I/O pool, so a wave of
+    # separations can never oversubscribe the default to_thread pool the
+    # request handlers rely on.
+    app.state.cpu_pool = ThreadPoolExecutor(
+        max_workers=app.state.settings.demucs_max_concurrency, thread_name_prefix="demucs"
+    )
+    app.state.io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="io")
     app.state.demo_job_id = cast(str | None, None)
     app.state.demo_response = cast("ProcessResponse | None", None)
+    app.state.demo_response_bytes = cast(bytes | None, None)
+    app.state.demo_file_stats = cast(dict[str, os.stat_result], {})
     app.state.demo_job_id = DEMO_JOB_ID
     _load_demo_data(app)
     cleanup_task = asyncio.create_task(_cleanup_loop(app))
@@ -96,7 +223,9 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         cleanup_task.cancel()
         with contextlib.suppress(asyncio.CancelledError):
             await cleanup_task
-        jobs = cast(dict[str, StoredJob], app.state.jobs)
+        app.state.cpu_pool.shutdown(wait=False, cancel_futures=True)
+        app.state.io_pool.shutdown(wait=False, cancel_futures=True)
+        jobs = cast(dict[int | str, StoredJob], app.state.jobs)
         demo_job_id = cast(str | None, app.state.demo_job_id)
         for job_id, job in jobs.items():
             if job_id == demo_job_id:
@@ -108,7 +237,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 def create_app(app_settings: Settings | None = None) -> FastAPI:
     """Create and configure the FastAPI app instance."""
 
-    app = FastAPI(title="Sounds Good Enough", lifespan=lifespan)
+    # orjson serializes the large lyrics payloads several times faster
+    # than stdlib json and emits bytes directly.
+    app = FastAPI(
+        title="Sounds Good Enough",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
     effective_settings = app_settings or get_settings()
     app.state.settings = effective_settings
 
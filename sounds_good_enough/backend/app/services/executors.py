@@ -0,0 +1,25 @@
+"""Helpers for running blocking work on dedicated thread pools."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+async def run_sync(
+    executor: Executor | None, func: Callable[..., T], *args: Any
+) -> T:
+    """Run a blocking callable off the event loop.
+
+    With an executor, work lands on that bounded pool so CPU-heavy jobs
+    (Demucs) cannot oversubscribe threads needed by I/O tasks; without
+    one it falls back to asyncio's default to_thread pool.
+    """
+
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args))
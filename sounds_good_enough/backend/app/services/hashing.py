@@ -0,0 +1,49 @@
+"""Streaming hash helpers for upload cache keys."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Protocol
+
+import xxhash
+
+try:
+    import blake3
+except ImportError:  # pragma: no cover - depends on the installed extras
+    blake3 = None  # type: ignore[assignment]
+
+
+class StreamHasher(Protocol):
+    """The streaming subset of the hashlib interface the cache keys need."""
+
+    def update(self, data: bytes) -> object: ...
+
+    def hexdigest(self) -> str: ...
+
+
+def new_cache_hasher(algo: str) -> tuple[StreamHasher, str]:
+    """Return a streaming hasher and the key prefix for upload cache keys.
+
+    blake3 hashes multi-gigabyte-per-second with SIMD and is preferred;
+    xxh3 is the fallback when the blake3 wheel is not installed. Keys
+    carry an algorithm prefix so entries from different algorithms can
+    never collide across a config change.
+    """
+
+    if algo == "blake3" and blake3 is not None:
+        return blake3.blake3(), "blake3"
+    return xxhash.xxh3_64(), "xxh3"
+
+
+def hash_file(path: Path, algo: str, chunk_size: int = 1 << 20) -> str:
+    """Hash a file in fixed-size chunks and return its prefixed cache key.
+
+    Never materializes the whole file as one bytes object, so peak
+    memory stays at one chunk regardless of file size.
+    """
+
+    hasher, prefix = new_cache_hasher(algo)
+    with path.open("rb") as source:
+        while chunk := source.read(chunk_size):
+            hasher.update(chunk)
+    return f"{prefix}:{hasher.hexdigest()}"
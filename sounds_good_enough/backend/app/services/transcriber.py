@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import mmap
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -13,7 +15,7 @@ class TranscriptionError(Exception):
     """Raised when transcription fails."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TranscriptionSegment:
     """A single transcribed text segment with timing."""
 
@@ -22,7 +24,7 @@ class TranscriptionSegment:
     stop_s: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TranscriptionResult:
     """Structured transcription result."""
 
@@ -30,6 +32,22 @@ class TranscriptionResult:
     segments: list[TranscriptionSegment]
 
 
+def _read_audio_bytes(path: Path) -> bytes:
+    """Read a vocals file through mmap so the OS pages it in on demand.
+
+    The Gradium SDK requires a bytes payload, so one copy is unavoidable,
+    but mapping avoids the extra buffered-read pass of Path.read_bytes on
+    long stems. Empty files cannot be mapped and fall back to a plain read.
+    """
+
+    with path.open("rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return bytes(mapped)
+        except ValueError:
+            return f.read()
+
+
 async def transcribe(audio_path: Path, api_key: str) -> TranscriptionResult:
     """Transcribe a WAV vocals file using Gradium buffered STT mode."""
 
@@ -37,7 +55,9 @@ async def transcribe(audio_path: Path, api_key: str) -> TranscriptionResult:
         raise TranscriptionError("Gradium API key is missing.")
 
     try:
-        audio_bytes = audio_path.read_bytes()
+        # Long stems take a while to page in; keep the event loop free for
+        # other requests while the read happens in a worker thread.
+        audio_bytes = await asyncio.to_thread(_read_audio_bytes, audio_path)
     except OSError as exc:
         raise TranscriptionError("Failed to read vocals audio for transcription.") from exc
 
@@ -54,3 +74,21 @@ async def transcribe(audio_path: Path, api_key: str) -> TranscriptionResult:
         for item in result.text_with_timestamps
     ]
     return TranscriptionResult(text=result.text, segments=segments)
+
+
+async def transcribe_many(
+    audio_paths: list[Path], api_key: str, max_in_flight: int = 4
+) -> list[TranscriptionResult]:
+    """Transcribe several vocals files concurrently.
+
+    File reads for one track overlap the STT round trip of another; the
+    semaphore caps how many Gradium requests are in flight at once.
+    """
+
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def _one(path: Path) -> TranscriptionResult:
+        async with semaphore:
+            return await transcribe(path, api_key)
+
+    return list(await asyncio.gather(*(_one(path) for path in audio_paths)))
@@ -9,6 +9,7 @@ from typing import Iterator
 import pytest
 from fastapi.testclient import TestClient
 
+from app.config import reset_settings
 from app.main import create_app
 
 
@@ -23,10 +24,17 @@ def temp_audio_file() -> Iterator[Path]:
 
 
 @pytest.fixture
-def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+def client(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[TestClient]:
     """Create a test client with deterministic runtime settings."""
 
     monkeypatch.setenv("GRADIUM_API_KEY", "gd_test_key")
+    # Isolate the on-disk content-addressed store so results from one
+    # test (or a previous run) never satisfy another test's upload.
+    monkeypatch.setenv("CAS_DIR", str(tmp_path / "cas"))
+    # get_settings is memoized; re-read the environment patched above and
+    # again on teardown so no other test sees these values.
+    reset_settings()
     app = create_app()
     with TestClient(app) as test_client:
         yield test_client
+    reset_settings()
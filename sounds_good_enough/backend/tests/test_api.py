@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import shutil
 from pathlib import Path
+from uuid import UUID
 
 from fastapi.testclient import TestClient
 
@@ -19,6 +21,7 @@ def test_process_and_files_flow(monkeypatch, client: TestClient) -> None:
         output_dir: Path,
         model: str = "htdemucs",
         device: str = "cpu",
+        executor: object | None = None,
     ) -> SeparationResult:
         vocals = output_dir / "vocals.wav"
         instrumental = output_dir / "instrumental.wav"
@@ -87,6 +90,7 @@ def test_process_uses_cache_for_identical_upload(monkeypatch, client: TestClient
         output_dir: Path,
         model: str = "htdemucs",
         device: str = "cpu",
+        executor: object | None = None,
     ) -> SeparationResult:
         call_counts["separate"] += 1
         vocals = output_dir / "vocals.wav"
@@ -119,3 +123,58 @@ def test_process_uses_cache_for_identical_upload(monkeypatch, client: TestClient
     assert first_response.json() == second_response.json()
     assert call_counts["separate"] == 1
     assert call_counts["transcribe"] == 1
+
+
+def test_process_restores_from_cas_after_eviction(monkeypatch, client: TestClient) -> None:
+    """An evicted job is rebuilt from the content-addressed store, not reprocessed."""
+
+    call_counts = {"separate": 0}
+
+    async def fake_separate(
+        input_path: Path,
+        output_dir: Path,
+        model: str = "htdemucs",
+        device: str = "cpu",
+        executor: object | None = None,
+    ) -> SeparationResult:
+        call_counts["separate"] += 1
+        vocals = output_dir / "vocals.wav"
+        instrumental = output_dir / "instrumental.wav"
+        vocals.write_bytes(b"vocals-audio")
+        instrumental.write_bytes(b"inst-audio")
+        return SeparationResult(vocals_path=vocals, instrumental_path=instrumental)
+
+    async def fake_transcribe(audio_path: Path, api_key: str) -> TranscriptionResult:
+        return TranscriptionResult(
+            text="durable lyrics",
+            segments=[TranscriptionSegment(text="durable", start_s=0.0, stop_s=0.6)],
+        )
+
+    monkeypatch.setattr(routes, "separate", fake_separate)
+    monkeypatch.setattr(routes, "transcribe", fake_transcribe)
+
+    first_response = client.post(
+        "/api/process",
+        files={"file": ("evicted.wav", b"RIFF....WAVE-evict", "audio/wav")},
+    )
+    assert first_response.status_code == 200
+    first_job_id = first_response.json()["job_id"]
+
+    # Simulate TTL eviction: drop the job and the cache entry entirely.
+    app_state = client.app.state
+    evicted = app_state.jobs.pop(UUID(first_job_id).int)
+    app_state.cache.clear()
+    shutil.rmtree(evicted.path, ignore_errors=True)
+
+    second_response = client.post(
+        "/api/process",
+        files={"file": ("evicted.wav", b"RIFF....WAVE-evict", "audio/wav")},
+    )
+    assert second_response.status_code == 200
+    payload = second_response.json()
+    assert payload["lyrics"] == "durable lyrics"
+    assert call_counts["separate"] == 1
+
+    vocals_resp = client.get(payload["vocals_url"])
+    assert vocals_resp.status_code == 200
+    assert vocals_resp.content == b"vocals-audio"
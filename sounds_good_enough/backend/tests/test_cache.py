@@ -0,0 +1,72 @@
+"""Unit tests for the bounded LRU cache."""
+
+from __future__ import annotations
+
+from app.cache import LRUCache
+
+
+def test_lru_evicts_oldest_and_calls_hook() -> None:
+    """Inserting past maxsize drops the oldest entry through on_evict."""
+
+    evicted: list[tuple[str, int]] = []
+    cache: LRUCache[str, int] = LRUCache(2, on_evict=lambda k, v: evicted.append((k, v)))
+
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["c"] = 3
+
+    assert "a" not in cache
+    assert evicted == [("a", 1)]
+    assert list(cache) == ["b", "c"]
+
+
+def test_lru_get_refreshes_recency() -> None:
+    """An accessed entry survives the next eviction."""
+
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+
+    assert cache.get("a") == 1
+    cache["c"] = 3
+
+    assert "a" in cache
+    assert "b" not in cache
+
+
+def test_ttl_expires_entries_on_access() -> None:
+    """A zero TTL drops unpinned entries at the next get."""
+
+    cache: LRUCache[str, int] = LRUCache(4, ttl=0.0)
+    cache["a"] = 1
+
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_pinned_entries_survive_eviction_and_ttl() -> None:
+    """Pinned keys are exempt from size eviction and expiry."""
+
+    cache: LRUCache[str, int] = LRUCache(2, ttl=0.0)
+    cache["demo"] = 1
+    cache.pin("demo")
+    cache["b"] = 2
+    cache["c"] = 3
+
+    assert cache.get("demo") == 1
+    assert "b" not in cache
+
+
+def test_eviction_and_pop_release_bookkeeping() -> None:
+    """Evicted and popped keys leave no trace in the internal side tables."""
+
+    cache: LRUCache[int, int] = LRUCache(2, ttl=60.0)
+    for i in range(100):
+        cache[i] = i
+    cache.pop(99)
+    cache.pop(12345, None)
+    cache.popitem()
+
+    assert len(cache) == 0
+    assert len(cache._written) == 0
+    assert len(cache._pinned) == 0
@@ -8,12 +8,77 @@ from typing import Any
 
 import pytest
 
+from app.services import separator
 from app.services.separator import SeparationError, separate
 
 
+def test_resolve_device_passes_explicit_devices_through() -> None:
+    """Anything but "auto" is returned untouched."""
+
+    assert separator._resolve_device("cpu") == "cpu"
+    assert separator._resolve_device("cuda") == "cuda"
+
+
+def test_resolve_device_auto_without_torch(monkeypatch: pytest.MonkeyPatch) -> None:
+    """"auto" falls back to cpu when torch is not importable."""
+
+    monkeypatch.setattr(separator, "torch", None)
+    assert separator._resolve_device("auto") == "cpu"
+
+
+@pytest.mark.asyncio
+async def test_separate_in_process(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """With torch importable, separation goes through the in-process API."""
+
+    input_path = tmp_path / "song.wav"
+    input_path.write_bytes(b"audio")
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    def fake_in_process(
+        in_path: Path, out_dir: Path, model: str, device: str
+    ) -> tuple[Path, Path]:
+        assert device == "cpu"
+        vocals = out_dir / "vocals.wav"
+        instrumental = out_dir / "instrumental.wav"
+        vocals.write_bytes(b"vocals")
+        instrumental.write_bytes(b"inst")
+        return vocals, instrumental
+
+    monkeypatch.setattr(separator, "torch", object())
+    monkeypatch.setattr(separator, "_separate_in_process", fake_in_process)
+
+    result = await separate(input_path=input_path, output_dir=output_dir, device="cpu")
+
+    assert result.vocals_path.read_bytes() == b"vocals"
+    assert result.instrumental_path.read_bytes() == b"inst"
+
+
+@pytest.mark.asyncio
+async def test_separate_in_process_failure(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Errors from the in-process API are wrapped in SeparationError."""
+
+    def broken_in_process(
+        in_path: Path, out_dir: Path, model: str, device: str
+    ) -> tuple[Path, Path]:
+        raise RuntimeError("could not decode input")
+
+    monkeypatch.setattr(separator, "torch", object())
+    monkeypatch.setattr(separator, "_separate_in_process", broken_in_process)
+
+    with pytest.raises(SeparationError, match="Demucs separation failed"):
+        await separate(
+            input_path=tmp_path / "song.wav", output_dir=tmp_path / "out", device="cpu"
+        )
+
+
 @pytest.mark.asyncio
-async def test_separate_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
-    """The separator returns copied vocals and instrumental files."""
+async def test_separate_subprocess_fallback(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Without torch, the separator falls back to the Demucs CLI."""
 
     input_path = tmp_path / "song.wav"
     input_path.write_bytes(b"audio")
@@ -28,6 +93,7 @@ async def test_separate_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path)
         (track_dir / "no_vocals.wav").write_bytes(b"inst")
         return subprocess.CompletedProcess(args=[], returncode=0)
 
+    monkeypatch.setattr(separator, "torch", None)
     monkeypatch.setattr(subprocess, "run", fake_run)
 
     result = await separate(input_path=input_path, output_dir=tmp_path / "out")
@@ -37,7 +103,9 @@ async def test_separate_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path)
 
 
 @pytest.mark.asyncio
-async def test_separate_demucs_failure(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+async def test_separate_subprocess_failure(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
     """A Demucs subprocess failure is wrapped in SeparationError."""
 
     input_path = tmp_path / "song.wav"
@@ -50,6 +118,7 @@ async def test_separate_demucs_failure(monkeypatch: pytest.MonkeyPatch, tmp_path
             stderr="something bad happened",
         )
 
+    monkeypatch.setattr(separator, "torch", None)
     monkeypatch.setattr(subprocess, "run", fake_run)
 
     with pytest.raises(SeparationError, match="Demucs separation failed"):